@@ -1 +1 @@
-python3 src/main.py "/bootdev-static-site-generator/"
\ No newline at end of file
+python3 src/main.py "/bootdev-static-site-generator/" --sync --hash
\ No newline at end of file
@@ -0,0 +1,70 @@
+import os
+import json
+from collections import Counter
+
+from manifest import hash_file
+from output import ReplacementFile
+from sync import list_files, remove_output, transfer_file
+from log import log
+
+ASSET_MANIFEST = "asset-manifest.json"
+FINGERPRINT_LENGTH = 10
+
+def hash_assets(root, previous=None, rel_paths=None):
+    # Returns {rel_path: {"size", "mtime_ns", "hash"}} for every file under root, or just rel_paths,
+    # reusing previous hashes for files whose size and mtime match
+    previous = previous or {}
+    hashes = {}
+    for rel_path in list_files(root) if rel_paths is None else rel_paths:
+        stat = os.stat(os.path.join(root, rel_path))
+        entry = previous.get(rel_path)
+        if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": hash_file(os.path.join(root, rel_path))}
+        hashes[rel_path] = entry
+    return hashes
+
+def fingerprint_path(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+def asset_urls(hashes):
+    # Root-relative URL of each asset mapped to the URL of its fingerprinted copy
+    urls = {}
+    for rel_path, entry in hashes.items():
+        url_path = rel_path.replace(os.sep, "/")
+        urls["/" + url_path] = "/" + fingerprint_path(url_path, entry["hash"])
+    return urls
+
+def changed_asset_urls(old_urls, new_urls):
+    return {url for url in old_urls.keys() | new_urls.keys() if old_urls.get(url) != new_urls.get(url)}
+
+def copy_fingerprinted(src, dest, hashes, previous=(), link=False, stats=None):
+    # Writes a fingerprinted copy of every asset plus the asset manifest, and removes previously
+    # written copies that are no longer current. Returns the paths written, relative to dest.
+    stats = Counter() if stats is None else stats
+    written = []
+    for rel_path, entry in sorted(hashes.items()):
+        fingerprinted = fingerprint_path(rel_path, entry["hash"])
+        dest_path = os.path.join(dest, fingerprinted)
+        # The name carries the content hash, so a file of the right size is already the right file
+        if os.path.exists(dest_path) and os.path.getsize(dest_path) == entry["size"]:
+            stats["unchanged"] += 1
+        else:
+            log(f"Copying file {os.path.join(src, rel_path)} to {dest_path}")
+            transfer_file(os.path.join(src, rel_path), dest_path, link)
+            stats["written"] += 1
+        written.append(fingerprinted)
+
+    if hashes:
+        asset_manifest = {rel_path.replace(os.sep, "/"): fingerprint_path(rel_path, entry["hash"]).replace(os.sep, "/") for rel_path, entry in hashes.items()}
+        replacement = ReplacementFile(os.path.join(dest, ASSET_MANIFEST))
+        with replacement as f:
+            json.dump(asset_manifest, f, indent=1, sort_keys=True)
+        stats["written" if replacement.changed else "unchanged"] += 1
+        written.append(ASSET_MANIFEST)
+
+    current = set(written)
+    for rel_path in previous:
+        if rel_path not in current and remove_output(os.path.join(dest, rel_path), dest):
+            stats["deleted"] += 1
+    return written
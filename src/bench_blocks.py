@@ -0,0 +1,51 @@
+import re
+import sys
+import random
+import timeit
+
+from textnodeparser import block_to_block_type
+from bench_build import paragraph, sentence
+
+# block_to_block_type as it was before the first-character dispatch, kept here as the baseline
+def block_to_block_type_reference(block):
+    if re.match(r"^#{1,6} .*$", block):
+        return "heading"
+    if block.startswith("```") and block.endswith("```"):
+        return "code"
+    line_starts = [line.split(" ", 1)[0] for line in block.split("\n")]
+    if all([prefix == ">" for prefix in line_starts]):
+        return "quote"
+    if all([prefix == "*" or prefix == "-" for prefix in line_starts]):
+        return "unordered_list"
+    if all([prefix == f"{i+1}." for i, prefix in enumerate(line_starts)]):
+        return "ordered_list"
+    return "paragraph"
+
+def paragraph_heavy_blocks(count, seed=0):
+    # Mostly multi-line paragraphs, with the occasional heading and list like a typical article
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(count):
+        if i % 10 == 0:
+            blocks.append(f"## Section {i}")
+        elif i % 10 == 5:
+            blocks.append("\n".join(f"- {sentence(rng, 6)}" for _ in range(5)))
+        else:
+            blocks.append("\n".join(paragraph(rng, i) for _ in range(4)))
+    return blocks
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    blocks = paragraph_heavy_blocks(count)
+    assert [block_to_block_type(block) for block in blocks] == [block_to_block_type_reference(block) for block in blocks]
+
+    results = {}
+    for name, func in (("before", block_to_block_type_reference), ("after", block_to_block_type)):
+        seconds = min(timeit.repeat(lambda: [func(block) for block in blocks], number=1, repeat=5))
+        results[name] = seconds
+        print(f"{name:<8} {seconds / len(blocks) * 1e9:>8.0f} ns/block")
+    print(f"speedup  {results['before'] / results['after']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
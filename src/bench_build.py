@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SRC_DIR)
+BASELINE_PATH = os.path.join(SRC_DIR, "bench_baseline.json")
+
+WORDS = "the quick brown fox jumps over lazy dog rivendell glorfindel bombadil hobbit shire".split()
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def paragraph(rng, i):
+    return f"{sentence(rng)} Some **bold {i}** and *italic* text with `code` and a [link](/blog/{i}). {sentence(rng)}"
+
+def small_page(rng, i):
+    blocks = [
+        f"# Page {i}",
+        paragraph(rng, i),
+        f"## Section {i}",
+        "\n".join(f"- {sentence(rng, 6)}" for _ in range(5)),
+        "> " + sentence(rng),
+        "```\nprint('page %d')\n```" % i,
+        "\n".join(f"{n + 1}. {sentence(rng, 5)}" for n in range(4)),
+        paragraph(rng, i + 1),
+    ]
+    return "\n\n".join(blocks)
+
+def large_page(rng, size):
+    blocks = ["# Large page"]
+    total = 0
+    i = 0
+    while total < size:
+        block = paragraph(rng, i) if i % 3 else "\n".join(f"- {sentence(rng, 8)}" for _ in range(10))
+        blocks.append(block)
+        total += len(block) + 2
+        i += 1
+    return "\n\n".join(blocks)
+
+def link_dense_page(rng, size):
+    blocks = ["# Links"]
+    total = 0
+    while total < size:
+        block = " ".join(f"[{rng.choice(WORDS)}](/blog/{rng.randrange(10000)}) ![{rng.choice(WORDS)}](/images/{rng.randrange(100)}.png)" for _ in range(200))
+        blocks.append(block)
+        total += len(block) + 2
+    return "\n\n".join(blocks)
+
+def long_list_page(rng, size):
+    # Alternating unordered and ordered lists of 1000 items each; the parser has no nested lists,
+    # and an indented item would turn the whole block into a paragraph
+    blocks = ["# Long lists"]
+    total = 0
+    while total < size:
+        if len(blocks) % 2:
+            block = "\n".join(f"- {sentence(rng, 6)} with *emphasis*" for _ in range(1000))
+        else:
+            block = "\n".join(f"{n + 1}. **Step {n + 1}** {sentence(rng, 6)}" for n in range(1000))
+        blocks.append(block)
+        total += len(block) + 2
+    return "\n\n".join(blocks)
+
+def code_block_page(rng, size):
+    lines = [f"    value_{n} = compute({n}, '{rng.choice(WORDS)}')" for n in range(size // 40)]
+    return "# Code\n\n```\n" + "\n".join(lines) + "\n```"
+
+# name: (description, page count, bytes per generated page); sizes scale with --scale
+CASES = {
+    "pages": ("full main() build of many small pages", 10000, None),
+    "large_page": ("one large mixed page", 1, 5 * 1024 * 1024),
+    "link_dense": ("paragraphs made almost entirely of links and images", 1, 2 * 1024 * 1024),
+    "long_lists": ("long unordered and ordered lists", 1, 2 * 1024 * 1024),
+    "code_blocks": ("one huge fenced code block", 1, 5 * 1024 * 1024),
+}
+
+GENERATORS = {
+    "large_page": large_page,
+    "link_dense": link_dense_page,
+    "long_lists": long_list_page,
+    "code_blocks": code_block_page,
+}
+
+def generate_corpus(case, root, scale=1.0, seed=0):
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    _, pages, size = CASES[case]
+    pages = max(1, int(pages * scale))
+    for i in range(pages):
+        page_dir = os.path.join(content_dir, f"section{i // 100}", f"page{i}")
+        os.makedirs(page_dir)
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(small_page(rng, i) if size is None else GENERATORS[case](rng, max(1024, int(size * scale))))
+    shutil.copytree(os.path.join(REPO_DIR, "static"), os.path.join(root, "static"))
+    shutil.copy(os.path.join(REPO_DIR, "template.html"), os.path.join(root, "template.html"))
+
+def run_case(case, root):
+    # Runs in a child process so ru_maxrss reflects this case alone
+    sys.path.insert(0, SRC_DIR)
+    import main as site
+    from textnodeparser import markdown_to_html_chunks
+
+    sources = []
+    for dir_path, _, files in os.walk(os.path.join(root, "content")):
+        sources.extend(os.path.join(dir_path, name) for name in files)
+    size = sum(os.path.getsize(path) for path in sources)
+
+    os.chdir(root)
+    start = time.perf_counter()
+    if case == "pages":
+        sys.argv = ["main.py", "--quiet"]
+        site.main()
+    else:
+        for path in sources:
+            with open(path) as f:
+                "".join(markdown_to_html_chunks(f.read()))
+    seconds = time.perf_counter() - start
+
+    return {
+        "pages": len(sources),
+        "bytes": size,
+        "seconds": seconds,
+        "pages_per_second": len(sources) / seconds,
+        "mb_per_second": size / 1024 / 1024 / seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def bench(case, scale):
+    with tempfile.TemporaryDirectory() as root:
+        generate_corpus(case, root, scale)
+        output = subprocess.run([sys.executable, __file__, "--run-case", case, root], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for case, result in results.items():
+        if case not in baseline:
+            continue
+        expected = baseline[case]["mb_per_second"]
+        change = result["mb_per_second"] / expected - 1
+        result["vs_baseline"] = change
+        if change < -tolerance:
+            regressions.append(f"{case}: {result['mb_per_second']:.2f} MB/s vs baseline {expected:.2f} MB/s ({change:+.0%})")
+    return regressions
+
+def print_results(results):
+    print(f"{'case':<14}{'pages':>8}{'MB':>9}{'seconds':>10}{'pages/s':>11}{'MB/s':>9}{'peak RSS MB':>13}{'vs baseline':>13}")
+    for case, result in results.items():
+        change = f"{result['vs_baseline']:+.0%}" if "vs_baseline" in result else "-"
+        print(f"{case:<14}{result['pages']:>8}{result['bytes'] / 1024 / 1024:>9.2f}{result['seconds']:>10.2f}{result['pages_per_second']:>11.1f}{result['mb_per_second']:>9.2f}{result['peak_rss_mb']:>13.1f}{change:>13}")
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run-case":
+        print(json.dumps(run_case(sys.argv[2], sys.argv[3])))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on synthetic content")
+    parser.add_argument("cases", nargs="*", metavar="case", help=f"cases to run: {', '.join(CASES)} (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply corpus sizes by this factor")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop before a case counts as a regression")
+    args = parser.parse_args()
+    for case in args.cases:
+        if case not in CASES:
+            parser.error(f"unknown case {case}")
+
+    results = {}
+    for case in args.cases or CASES:
+        print(f"Running {case}: {CASES[case][0]}", file=sys.stderr)
+        results[case] = bench(case, args.scale)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    # Throughput only compares meaningfully at the scale the baseline was recorded at
+    regressions = compare(results, baseline.get(str(args.scale), {}), args.tolerance)
+    print_results(results)
+
+    if args.save_baseline:
+        baseline[str(args.scale)] = results
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+    if regressions:
+        print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import sys
+import time
+import tracemalloc
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+# Dict-backed copies of the node classes as they were before __slots__, kept here as the baseline
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+    def __eq__(self, other):
+        return self.__repr__() == other.__repr__()
+
+    def __repr__(self):
+        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
+
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, props=props)
+
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, children=children, props=props)
+
+
+def build_page(text_node_class, leaf_class, parent_class, blocks):
+    # Roughly the node mix markdown_to_htmlnode produces for a paragraph-heavy page
+    text_nodes = []
+    children = []
+    for i in range(blocks):
+        inline = [
+            text_node_class("Some text ", TextType.TEXT),
+            text_node_class("bold", TextType.BOLD),
+            text_node_class(" and a ", TextType.TEXT),
+            text_node_class("link", TextType.LINK, f"/page/{i}"),
+        ]
+        text_nodes.extend(inline)
+        leaves = [
+            leaf_class(None, inline[0].text),
+            leaf_class("b", inline[1].text),
+            leaf_class(None, inline[2].text),
+            leaf_class("a", inline[3].text, {"href": inline[3].url}),
+        ]
+        children.append(parent_class("p", leaves))
+    return text_nodes, parent_class("div", children)
+
+def measure(name, text_node_class, leaf_class, parent_class, blocks):
+    start = time.perf_counter()
+    text_nodes, page = build_page(text_node_class, leaf_class, parent_class, blocks)
+    build_time = time.perf_counter() - start
+
+    # Measure memory on a separate build; tracemalloc would skew the timing above
+    tracemalloc.start()
+    retained = build_page(text_node_class, leaf_class, parent_class, blocks)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del retained
+
+    _, other = build_page(text_node_class, leaf_class, parent_class, blocks)
+    # Differ only in the very first leaf so an early-exit comparison can stop immediately
+    other.children[0].children[0].value = "Different text "
+    start = time.perf_counter()
+    page == other
+    eq_time = time.perf_counter() - start
+
+    nodes = len(text_nodes) + blocks * 5 + 1
+    print(f"{name:<8} {nodes:>9} nodes  {memory / 1024 / 1024:>8.2f} MiB  build {build_time * 1000:>8.1f} ms  __eq__ {eq_time * 1000:>8.2f} ms")
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    measure("before", DictTextNode, DictLeafNode, DictParentNode, blocks)
+    measure("after", TextNode, LeafNode, ParentNode, blocks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import sys
+import random
+import tempfile
+import timeit
+
+from textnodeparser import MarkdownSource, iter_blocks
+from bench_build import GENERATORS
+
+# Scans each generated page into blocks through the text-mode line reader generate_page used before
+# MarkdownSource, and through MarkdownSource's memory-mapped reader
+def read_lines(path):
+    with open(path, "r") as f:
+        return list(iter_blocks(f))
+
+def read_mapped(path):
+    with MarkdownSource(path) as src:
+        return list(src.iter_blocks())
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, generate in GENERATORS.items():
+            path = os.path.join(tmp, f"{name}.md")
+            with open(path, "w") as f:
+                f.write(generate(random.Random(0), int(5 * 1024 * 1024 * scale)))
+            assert read_lines(path) == read_mapped(path)
+
+            results = {}
+            for reader, func in (("lines", read_lines), ("mapped", read_mapped)):
+                results[reader] = min(timeit.repeat(lambda: func(path), number=1, repeat=5))
+            print(f"{name:<14} lines {results['lines'] * 1000:>8.1f} ms   mapped {results['mapped'] * 1000:>8.1f} ms   speedup {results['lines'] / results['mapped']:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+import htmlnode
+
+# Bump when the shape of cached entries changes so old on-disk entries are never read back
+CACHE_VERSION = 3
+
+class BlockCache:
+    def __init__(self, max_entries=4096, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, block_type, block, basepath):
+        # The basepath and asset fingerprints are part of the key because root-relative links are rewritten during serialization
+        return hashlib.sha256(f"{CACHE_VERSION}\0{block_type}\0{basepath}\0{htmlnode.ASSET_URLS_KEY}\0{block}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:] + ".json")
+
+    def get(self, key):
+        # Entries are (html, refs) pairs
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if self.directory:
+            try:
+                with open(self.path(key), "r") as f:
+                    html, refs = json.load(f)
+            except (FileNotFoundError, ValueError):
+                pass
+            else:
+                entry = (html, [tuple(ref) for ref in refs])
+                self.remember(key, entry)
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key, entry):
+        self.remember(key, entry)
+        if self.directory:
+            path = self.path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent workers never read a half-written entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+
+    def remember(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __repr__(self):
+        return f"BlockCache({len(self.entries)}/{self.max_entries}, {self.directory}, hits={self.hits}, misses={self.misses})"
+
+
+_block_cache = None
+
+def configure_block_cache(max_entries, directory=None):
+    global _block_cache
+    _block_cache = BlockCache(max_entries, directory) if max_entries > 0 or directory else None
+
+def get_block_cache():
+    return _block_cache
@@ -0,0 +1,99 @@
+import os
+import gzip
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from assets import hash_assets
+from output import ReplacementFile
+from sync import list_files, remove_output
+from log import log
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".svg", ".js", ".json", ".xml", ".txt")
+# Below this size a response fits in a packet or two either way
+MIN_SIZE = 512
+# A variant has to save at least a tenth of the file to be worth serving
+MAX_RATIO = 0.9
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, 9, mtime=0)
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=11)
+
+ENCODERS = {".gz": gzip_bytes}
+if brotli:
+    ENCODERS[".br"] = brotli_bytes
+
+def available_encodings():
+    return tuple(ENCODERS)
+
+def compress_file(job):
+    # Writes each variant that pays off next to the file and removes the ones that don't.
+    # Returns (variants kept, variants written, variants removed).
+    path, encodings = job
+    with open(path, "rb") as f:
+        data = f.read()
+
+    variants = []
+    written = 0
+    removed = 0
+    for ext in encodings:
+        compressed = ENCODERS[ext](data) if len(data) >= MIN_SIZE else None
+        if compressed is not None and len(compressed) <= len(data) * MAX_RATIO:
+            replacement = ReplacementFile(path + ext, "wb")
+            with replacement as f:
+                f.write(compressed)
+            variants.append(ext)
+            written += replacement.changed
+        elif os.path.exists(path + ext):
+            os.remove(path + ext)
+            removed += 1
+    return variants, written, removed
+
+def compress_output(root, previous=None, encodings=(), workers=1, stats=None):
+    # Writes .gz (and .br, when the brotli module is installed) siblings for the text files under root.
+    # Only files whose content hash changed since previous are compressed again.
+    # Returns {rel_path: {"size", "mtime_ns", "hash", "encodings", "variants"}} for the next build.
+    previous = previous or {}
+    stats = Counter() if stats is None else stats
+    rel_paths = [rel_path for rel_path in list_files(root) if os.path.splitext(rel_path)[1] in COMPRESSIBLE_EXTENSIONS] if encodings else []
+    hashes = hash_assets(root, previous, rel_paths)
+
+    compressed = {}
+    jobs = []
+    for rel_path, entry in hashes.items():
+        old = previous.get(rel_path)
+        if old and old["hash"] == entry["hash"] and old["encodings"] == list(encodings) and all(os.path.exists(os.path.join(root, rel_path + ext)) for ext in old["variants"]):
+            compressed[rel_path] = old
+            stats["unchanged"] += len(old["variants"])
+        else:
+            jobs.append(rel_path)
+
+    paths = [(os.path.join(root, rel_path), encodings) for rel_path in jobs]
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compress_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+    else:
+        results = [compress_file(path) for path in paths]
+
+    for rel_path, (variants, written, removed) in zip(jobs, results):
+        log(f"Compressed {os.path.join(root, rel_path)}: {', '.join(variants) or 'not worth it'}")
+        entry = hashes[rel_path]
+        compressed[rel_path] = {"size": entry["size"], "mtime_ns": entry["mtime_ns"], "hash": entry["hash"], "encodings": list(encodings), "variants": variants}
+        stats["written"] += written
+        stats["unchanged"] += len(variants) - written
+        stats["deleted"] += removed
+
+    # Files that were removed, or are no longer compressed, take their variants with them
+    for rel_path, old in previous.items():
+        if rel_path not in compressed:
+            for ext in old["variants"]:
+                if remove_output(os.path.join(root, rel_path + ext), root):
+                    stats["deleted"] += 1
+    return compressed
@@ -0,0 +1,122 @@
+import os
+import json
+import socket
+import socketserver
+
+from manifest import hash_file
+from textnodeparser import MarkdownSource, block_to_htmlnode, locate_refs, extract_title
+
+SOCKET_PATH = "./.cache/build.sock"
+
+class ParsedPage:
+    # A page's markdown parsed down to HTMLNode trees, which can be serialized for any basepath
+    def __init__(self, stamp, digest, title, nodes, refs):
+        self.stamp = stamp
+        self.digest = digest
+        self.title = title
+        self.nodes = nodes
+        # (text type, url, line number), as generate_page returns them
+        self.refs = refs
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def parse_page(path):
+    stamp = file_stamp(path)
+    nodes = []
+    refs = []
+    with MarkdownSource(path) as src:
+        title = extract_title(src.first_line())
+        for block_type, block, line_number in src.iter_blocks():
+            block_refs = []
+            node = block_to_htmlnode(block_type, block, block_refs)
+            if node:
+                nodes.append(node)
+            refs.extend((text_type, url, line_number + offset) for text_type, url, offset in locate_refs(block, block_refs))
+    return ParsedPage(stamp, hash_file(path), title, nodes, refs)
+
+def iter_page_html(page, basepath=None):
+    # Same chunks as blocks_to_html_chunks gives for the page's markdown
+    yield "<div>"
+    for node in page.nodes:
+        yield from node.iter_html(basepath)
+    yield "</div>"
+
+class PageCache:
+    # Parsed pages kept between builds; a page is parsed again only when its mtime or size moves
+    def __init__(self):
+        self.pages = {}
+        self.parsed = 0
+
+    def get(self, path):
+        page = self.pages.get(path)
+        if page is None or page.stamp != file_stamp(path):
+            # A page that fails to parse isn't cached, so the next build reports it again
+            self.pages.pop(path, None)
+            page = parse_page(path)
+            self.pages[path] = page
+            self.parsed += 1
+        return page
+
+    def prune(self, paths):
+        for path in self.pages.keys() - set(paths):
+            del self.pages[path]
+
+class BuildHandler(socketserver.StreamRequestHandler):
+    # One JSON request per connection, answered with one JSON response
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as e:
+            response = {"error": f"bad request: {e}"}
+        else:
+            if request.get("stop"):
+                self.server.stopping = True
+                response = {"stopped": True}
+            else:
+                try:
+                    response = self.server.build(request)
+                except Exception as e:
+                    # A failed build is reported to the client, the daemon and its cache carry on
+                    response = {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write((json.dumps(response) + "\n").encode())
+
+class BuildServer(socketserver.UnixStreamServer):
+    # Requests are handled one at a time on the serving thread, so builds never overlap
+    def __init__(self, path, build):
+        self.build = build
+        self.stopping = False
+        super().__init__(path, BuildHandler)
+
+    def serve_until_stopped(self):
+        while not self.stopping:
+            self.handle_request()
+
+def daemon_running(path=SOCKET_PATH):
+    # A socket file can outlive its daemon; only a connection proves one is listening
+    if not os.path.exists(path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+def start_server(build, path=SOCKET_PATH):
+    if daemon_running(path):
+        raise OSError(f"a build daemon is already listening on {path}")
+    if os.path.exists(path):
+        os.remove(path)
+    socket_dir = os.path.dirname(path)
+    if socket_dir:
+        os.makedirs(socket_dir, exist_ok=True)
+    return BuildServer(path, build)
+
+def send_request(request, path=SOCKET_PATH):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile("r") as f:
+            return json.loads(f.readline())
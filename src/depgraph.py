@@ -0,0 +1,69 @@
+import os
+import posixpath
+
+class DependencyResolver:
+    def __init__(self, content_dir, static_files, pages):
+        # static_files are paths relative to ./static, pages are source paths under content_dir;
+        # both become sets so resolving a reference never touches the filesystem
+        self.content_dir = content_dir
+        self.static_files = set(static_files)
+        self.pages = set(pages)
+
+    def resolve(self, url):
+        # Returns ("asset", static path), ("page", source path) or None for external and anchor-only urls
+        if not url.startswith("/") or url.startswith("//"):
+            return None
+        path = posixpath.normpath(url.split("#", 1)[0].split("?", 1)[0]).lstrip("/")
+        if path in self.static_files:
+            return ("asset", path)
+
+        if path.endswith(".html"):
+            path = path[:-5]
+            if path == "index" or path.endswith("/index"):
+                path = path[:-5]
+        candidates = [os.path.join(self.content_dir, path, "index.md")]
+        if path and not path.endswith("/"):
+            candidates.append(os.path.join(self.content_dir, path + ".md"))
+        for candidate in candidates:
+            if candidate in self.pages:
+                return ("page", candidate)
+
+        # Unknown target: a file extension means it was meant to be an asset, anything else a page
+        if os.path.splitext(path)[1]:
+            return ("asset", path)
+        return ("page", candidates[0])
+
+    def page_dependencies(self, refs):
+        assets = set()
+        links = set()
+        # refs are (text type, url, line) as recorded while rendering
+        for _, url, _ in refs:
+            target = self.resolve(url)
+            if target is None:
+                continue
+            kind, path = target
+            (assets if kind == "asset" else links).add(path)
+        return {"assets": sorted(assets), "links": sorted(links)}
+
+
+def rebuild_reasons(entry, old_entry, global_reasons, changed_assets=(), output_path=None):
+    # Why a page's output is out of date; an empty list means it can be skipped.
+    # Linked pages are recorded in the graph but don't feed into the page HTML. Assets do once
+    # they are fingerprinted, so changed_assets holds static paths whose fingerprinted URL changed.
+    reasons = list(global_reasons)
+    if old_entry is None:
+        reasons.append("new page")
+    else:
+        if old_entry["hash"] != entry["hash"]:
+            reasons.append("markdown changed")
+        if old_entry["dest"] != entry["dest"]:
+            reasons.append("output path changed")
+        if changed_assets and not changed_assets.isdisjoint(old_entry.get("assets", ())):
+            reasons.append("asset changed")
+    # output_path is where the page is actually written when that isn't its recorded dest, e.g. a shard
+    if not os.path.exists(output_path or entry["dest"]):
+        reasons.append("output missing")
+    return reasons
+
+def linked_from(pages, from_path):
+    return sorted(path for path, entry in pages.items() if from_path in entry.get("links", ()))
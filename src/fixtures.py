@@ -0,0 +1,46 @@
+import os
+import sys
+import shutil
+import filecmp
+import unittest
+import tempfile
+import subprocess
+
+# Shared scaffolding for the tests; named so unittest discovery doesn't collect it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "src", "main.py")
+CONTENT_DIR = os.path.join(ROOT, "content")
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def read(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+class TempDirTestCase(unittest.TestCase):
+    # Each test gets a fresh directory in self.tmp, removed afterwards
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+
+class SiteTestCase(TempDirTestCase):
+    # A copy of the repo's sources in self.tmp, for running main.py against
+    def setUp(self):
+        super().setUp()
+        for name in ("content", "static"):
+            shutil.copytree(os.path.join(ROOT, name), os.path.join(self.tmp.name, name))
+        shutil.copy(os.path.join(ROOT, "template.html"), self.tmp.name)
+
+    def run_main(self, *args):
+        return subprocess.run([sys.executable, MAIN, *args], cwd=self.tmp.name, capture_output=True, text=True)
+
+    def assert_same_tree(self, a, b):
+        compare = filecmp.dircmp(a, b)
+        self.assertEqual((compare.left_only, compare.right_only, compare.diff_files), ([], [], []))
+        for sub in compare.common_dirs:
+            self.assert_same_tree(os.path.join(a, sub), os.path.join(b, sub))
@@ -1,47 +1,125 @@
+import re
+import hashlib
+
+URL_ATTRIBUTES = ("href", "src")
+URL_PATH_RE = re.compile(r"[^?#]*")
+
+# Root-relative asset URLs mapped to their fingerprinted names, see set_asset_urls
+ASSET_URLS = {}
+ASSET_URLS_KEY = ""
+
+def set_asset_urls(urls):
+    # Anything that caches rewritten URLs keys on ASSET_URLS_KEY as well as the basepath
+    global ASSET_URLS_KEY
+    ASSET_URLS.clear()
+    ASSET_URLS.update(urls)
+    ASSET_URLS_KEY = hashlib.sha256(repr(sorted(urls.items())).encode()).hexdigest() if urls else ""
+
+def escape_text(text):
+    # Nearly all text has nothing to escape, and three substring checks are far cheaper than rebuilding it.
+    # Chained replace measured several times faster than str.translate with a multi-character table.
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def escape_attribute(value):
+    value = escape_text(value)
+    if '"' not in value:
+        return value
+    return value.replace('"', "&quot;")
+
+def rewrite_url(url, basepath=None):
+    # Root-relative URLs get the site basepath and, for fingerprinted assets, the hashed filename;
+    # everything else is left alone
+    if basepath and url.startswith("/"):
+        if ASSET_URLS:
+            path = URL_PATH_RE.match(url).group()
+            url = ASSET_URLS.get(path, path) + url[len(path):]
+        return basepath + url[1:]
+    return url
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props", "props_html")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
+        # (props, basepath, asset URLs key, attribute string) from the last props_to_html call
+        self.props_html = None
+
+    def to_html(self, basepath=None):
+        raise NotImplementedError
 
-    def to_html(self):
+    def iter_html(self, basepath=None):
         raise NotImplementedError
+
+    def write_html(self, fp, basepath=None):
+        fp.writelines(self.iter_html(basepath))
     
-    def props_to_html(self):
-        if self.props:
-            return "".join([f' {key}="{value}"' for key, value in self.props.items()])
-        return ""
+    def props_to_html(self, basepath=None):
+        # The attribute string is kept until props is replaced or the URL rewrite changes;
+        # assign a new dict rather than editing props in place after serializing
+        if not self.props:
+            return ""
+        cached = self.props_html
+        if cached is not None and cached[0] is self.props and cached[1] == basepath and cached[2] == ASSET_URLS_KEY:
+            return cached[3]
+        html = "".join([f' {key}="{escape_attribute(rewrite_url(value, basepath) if key in URL_ATTRIBUTES else value)}"' for key, value in self.props.items()])
+        self.props_html = (self.props, basepath, ASSET_URLS_KEY, html)
+        return html
     
     def __eq__(self, other):
-        return self.__repr__() == other.__repr__()
+        # Compare structurally and stop at the first difference rather than formatting both subtrees
+        if not isinstance(other, HTMLNode):
+            return NotImplemented
+        if self.tag != other.tag or self.value != other.value or self.props != other.props:
+            return False
+        if self.children is None or other.children is None:
+            return self.children is other.children
+        return len(self.children) == len(other.children) and all(a == b for a, b in zip(self.children, other.children))
     
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, props=props)
 
-    def to_html(self):
+    def to_html(self, basepath=None):
         if not self.value:
             raise ValueError("LeafNode must have a value")
         if not self.tag:
-            return self.value
+            return escape_text(self.value)
         if self.tag == "img":
-            return f'<{self.tag} src="{self.value}"{self.props_to_html()}>'
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return f'<{self.tag} src="{escape_attribute(rewrite_url(self.value, basepath))}"{self.props_to_html(basepath)}>'
+        return f"<{self.tag}{self.props_to_html(basepath)}>{escape_text(self.value)}</{self.tag}>"
+
+    def iter_html(self, basepath=None):
+        yield self.to_html(basepath)
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, children=children, props=props)
 
-    def to_html(self):
+    def to_html(self, basepath=None):
+        return "".join(self.iter_html(basepath))
+
+    def iter_html(self, basepath=None):
+        # Yield tags and leaf values as they are produced so nesting never re-copies a subtree
         if not self.tag:
             raise ValueError("ParentNode must have a tag")
         if not self.children:
             raise ValueError("ParentNode must have children")
-        children_html = "".join([node.to_html() for node in self.children])
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
\ No newline at end of file
+        yield f"<{self.tag}{self.props_to_html(basepath)}>"
+        for node in self.children:
+            yield from node.iter_html(basepath)
+        yield f"</{self.tag}>"
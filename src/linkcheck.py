@@ -0,0 +1,23 @@
+from depgraph import DependencyResolver
+
+def check_links(pages, static_files, dir_path_content):
+    # One pass over the references recorded while rendering; no markdown is parsed again.
+    # Returns (source, line, text type, url) for every internal target that was not generated or copied.
+    resolver = DependencyResolver(dir_path_content, static_files, pages)
+    broken = []
+    for from_path in sorted(pages):
+        for text_type, url, line in pages[from_path].get("refs", []):
+            target = resolver.resolve(url)
+            if target is None:
+                continue
+            kind, path = target
+            if path not in (resolver.static_files if kind == "asset" else resolver.pages):
+                broken.append((from_path, line, text_type, url))
+    return broken
+
+def report_broken_links(broken):
+    for from_path, line, text_type, url in broken:
+        description = "missing image" if text_type == "image" else "broken link"
+        print(f"{from_path}:{line}: {description} {url}")
+    if broken:
+        print(f"Found {len(broken)} broken reference(s)")
@@ -0,0 +1,10 @@
+QUIET = False
+
+def set_quiet(quiet):
+    global QUIET
+    QUIET = quiet
+
+def log(message):
+    # Per-file progress lines; --quiet drops them, which matters once a site has thousands of files
+    if not QUIET:
+        print(message)
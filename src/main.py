@@ -1,17 +1,39 @@
 import sys
 import os
 import shutil
+import time
+import argparse
+from itertools import repeat
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from textnode import TextNode, TextType
-from htmlnode import LeafNode, ParentNode
+from htmlnode import LeafNode, ParentNode, ASSET_URLS, escape_text, set_asset_urls
+import textnodeparser
 from textnodeparser import *
+from manifest import MANIFEST_PATH, hash_file, load_manifest, save_manifest
+from watch import snapshot, diff_snapshots, serve
+from sync import list_files, remove_output, sync_files
+from profiler import NULL_PROFILER, PageProfiler, build_report, write_report, print_summary
+import log as buildlog
+from log import log
+from depgraph import DependencyResolver, rebuild_reasons, linked_from
+from linkcheck import check_links, report_broken_links
+from blockcache import configure_block_cache, get_block_cache
+from template import load_template, template_urls
+from assets import hash_assets, asset_urls, changed_asset_urls, copy_fingerprinted
+from compress import available_encodings, compress_output
+from shard import parse_shard, shard_pages, shard_dir, shard_manifest_path, check_shard_manifests, merge_manifests, merge_outputs
+from search import SEARCH_CACHE_PATH, indexed_pages, update_search_index, remove_search_index
+from output import FileWriter, OutputWriter, begin_staging, make_dirs, publish, relocate
+from daemon import SOCKET_PATH, PageCache, iter_page_html, start_server, send_request
 
-def copy_files(src, dest):
-    if os.path.exists(dest):
-        print(f"Removing {dest}")
+def copy_files(src, dest, clean=True, stats=None):
+    if clean and os.path.exists(dest):
+        log(f"Removing {dest}")
         shutil.rmtree(dest)
     if not os.path.exists(dest):
-        print(f"Creating {dest}")
+        log(f"Creating {dest}")
         os.mkdir(dest)
 
     for item in os.listdir(src):
@@ -19,31 +41,591 @@ def copy_files(src, dest):
         dest_item = os.path.join(dest, item)
 
         if os.path.isdir(src_item):
-            print(f"Copying directory {src_item} to {dest_item}")
-            copy_files(src_item, dest_item)
+            log(f"Copying directory {src_item} to {dest_item}")
+            copy_files(src_item, dest_item, clean, stats)
         else:
-            print(f"Copying file {src_item} to {dest_item}")
+            log(f"Copying file {src_item} to {dest_item}")
+            if os.path.exists(dest_item):
+                # Replace rather than overwrite, the file may be hardlinked into the live site
+                os.remove(dest_item)
             shutil.copy(src_item, dest_item)
+            if stats is not None:
+                stats["written"] += 1
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for item in os.listdir(dir_path_content):
+def collect_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for item in sorted(os.listdir(dir_path_content)):
         item_path = os.path.join(dir_path_content, item)
         if os.path.isdir(item_path):
             dest_path = os.path.join(dest_dir_path, item)
-            generate_pages_recursive(item_path, template_path, dest_path, basepath)
+            pages.extend(collect_pages(item_path, dest_path))
+        elif item.endswith(".md"):
+            pages.append((item_path, os.path.join(dest_dir_path, item[:-3] + ".html")))
+    return pages
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, shard=None):
+    for from_path, dest_path in shard_pages(collect_pages(dir_path_content, dest_dir_path), shard):
+        generate_page(from_path, template_path, dest_path, basepath)
+
+def try_generate_page(job, profile=False, writer=None, search=False):
+    from_path, template_path, dest_path, basepath = job
+    profiler = PageProfiler() if profile else NULL_PROFILER
+    writer = writer or FileWriter()
+    index = {} if search else None
+    try:
+        refs = generate_page(from_path, template_path, dest_path, basepath, profiler, writer, index)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    if index is not None:
+        index["terms"] = dict(index["terms"])
+    # A background writer only knows whether the page changed once it has been written
+    return {"error": None, "refs": refs, "profile": profiler.to_dict() if profiler else None, "unchanged": dest_path in writer.unchanged, "index": index}
+
+def init_worker(quiet, cache_config, urls, renderer):
+    # Worker processes may be spawned rather than forked, so settings are passed explicitly
+    buildlog.set_quiet(quiet)
+    configure_block_cache(*cache_config)
+    set_asset_urls(urls)
+    set_renderer(renderer)
+
+def generate_pages(jobs, workers=1, profile=False, background=False, search=False):
+    # Returns {from_path: result} in job order, each with the page's error or its refs and profile.
+    # With background, a serial build hands each rendered page to a writer thread.
+    # With search, each result also carries the page's title and terms for the search index.
+    created_dirs = make_dirs(job[2] for job in jobs)
+    if workers > 1 and len(jobs) > 1:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        cache = get_block_cache()
+        cache_config = (cache.max_entries, cache.directory) if cache else (0, None)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(buildlog.QUIET, cache_config, dict(ASSET_URLS), textnodeparser.RENDERER)) as executor:
+            results = list(executor.map(try_generate_page, jobs, repeat(profile), repeat(None), repeat(search), chunksize=chunksize))
+    elif background and not profile:
+        writer = OutputWriter(created_dirs)
+        results = [try_generate_page(job, profile, writer, search) for job in jobs]
+        failed = writer.close()
+        for job, result in zip(jobs, results):
+            if job[2] in failed:
+                result["error"] = failed[job[2]]
+            result["unchanged"] = job[2] in writer.unchanged
+    else:
+        results = [try_generate_page(job, profile, search=search) for job in jobs]
+
+    return {job[0]: result for job, result in zip(jobs, results)}
+
+def page_errors(results):
+    return {from_path: result["error"] for from_path, result in results.items() if result["error"]}
+
+def global_rebuild_reasons(manifest, template_hash, basepath, force):
+    reasons = []
+    if force:
+        reasons.append("full build")
+    if manifest.get("template") != template_hash:
+        reasons.append("template changed")
+    if manifest.get("basepath") != basepath:
+        reasons.append("basepath changed")
+    return reasons
+
+class BuildOptions:
+    # Per-build settings for generate_pages_incremental. The manifest always records paths under dest_dir_path;
+    # with output_dir (a staging tree or a shard's directory) the files are written there instead, from a
+    # background thread with background. With shard (K, N) only that shard's pages are built. stats counts
+    # pages written, left unchanged and deleted, and profiles, if given, gets each rendered page's profile.
+    # indexed, if given, is {from_path: hash} of the pages the search index already covers; the others are
+    # rendered so page_index gets their terms.
+    def __init__(self, output_dir=None, background=False, stats=None, shard=None, profiles=None, indexed=None, page_index=None):
+        self.output_dir = output_dir
+        self.background = background
+        self.stats = Counter() if stats is None else stats
+        self.shard = shard
+        self.profiles = profiles
+        self.indexed = indexed
+        self.page_index = page_index
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, basepath, manifest, force=False, workers=1, options=None):
+    options = options or BuildOptions()
+    stats = options.stats
+    output_dir = options.output_dir or dest_dir_path
+    old_pages = manifest.get("pages", {})
+
+    template_hash = hash_file(template_path)
+    global_reasons = global_rebuild_reasons(manifest, template_hash, basepath, force)
+    # Pages are rewritten to point at fingerprinted assets, so a new fingerprint is a new page
+    changed_urls = changed_asset_urls(manifest.get("asset_urls", {}), ASSET_URLS)
+    if not changed_urls.isdisjoint(template_urls(read_file(template_path))):
+        global_reasons.append("template asset changed")
+    changed_assets = {url[1:] for url in changed_urls}
+    if global_reasons and not force:
+        print(f"{', '.join(global_reasons).capitalize()}, regenerating all pages")
+
+    pages = {}
+    jobs = []
+    for from_path, dest_path in shard_pages(collect_pages(dir_path_content, dest_dir_path), options.shard):
+        entry = {"hash": hash_file(from_path), "dest": dest_path}
+        old_entry = old_pages.get(from_path)
+        output_path = relocate(dest_path, dest_dir_path, output_dir)
+        reasons = rebuild_reasons(entry, old_entry, global_reasons, changed_assets, output_path)
+        if not reasons and options.indexed is not None and options.indexed.get(from_path) != entry["hash"]:
+            # A page's words are only collected while it renders
+            reasons.append("not in search index")
+        if reasons:
+            jobs.append((from_path, template_path, output_path, basepath))
         else:
-            if item.endswith(".md"):
-                dest_path = os.path.join(dest_dir_path, item[:-3] + ".html")
-                generate_page(item_path, template_path, dest_path, basepath)
+            # Unchanged pages keep the dependencies recorded when they were last rendered
+            entry.update({key: old_entry.get(key, []) for key in ("assets", "links", "refs")})
+        entry["reasons"] = reasons
+        pages[from_path] = entry
+
+    results = generate_pages(jobs, workers, options.profiles is not None, options.background, options.indexed is not None)
+    resolver = DependencyResolver(dir_path_content, manifest.get("static", ()), pages)
+    for from_path, result in results.items():
+        if result["error"]:
+            # Leave failed pages out of the manifest so the next build retries them
+            del pages[from_path]
+            continue
+        pages[from_path].update(resolver.page_dependencies(result["refs"]))
+        pages[from_path]["refs"] = result["refs"]
+        stats["unchanged" if result["unchanged"] else "written"] += 1
+        if options.profiles is not None:
+            options.profiles[from_path] = result["profile"]
+        if options.page_index is not None:
+            options.page_index[from_path] = result["index"]
+
+    # A page that failed keeps its last good output; it is only missing from the manifest so the next build retries it
+    dest_paths = {entry["dest"] for entry in pages.values()}
+    failed = {from_path for from_path, result in results.items() if result["error"]}
+    for from_path, entry in old_pages.items():
+        if from_path not in pages and from_path not in failed and entry["dest"] not in dest_paths:
+            if remove_output(relocate(entry["dest"], dest_dir_path, output_dir), output_dir):
+                stats["deleted"] += 1
+
+    manifest.update({"template": template_hash, "basepath": basepath, "asset_urls": dict(ASSET_URLS), "pages": pages})
+    return page_errors(results)
+
+def find_page(page, pages, dir_path_content="./content"):
+    # Accepts a markdown source, a generated output or a site URL
+    candidates = [page, "./" + os.path.normpath(page)]
+    for from_path, entry in pages.items():
+        if os.path.normpath(entry["dest"]) == os.path.normpath(page):
+            candidates.append(from_path)
+    target = DependencyResolver(dir_path_content, (), pages).resolve("/" + page.lstrip("/"))
+    if target:
+        candidates.append(target[1])
+    for candidate in candidates:
+        if candidate in pages:
+            return candidate
+    return None
+
+def explain(page, basepath, template_path="./template.html"):
+    manifest = load_manifest()
+    pages = manifest.get("pages", {})
+    from_path = find_page(page, pages)
+    if from_path is None:
+        print(f"{page} is not in the last build's manifest")
+        return 1
+
+    entry = pages[from_path]
+    print(f"{from_path} -> {entry['dest']}")
+    if entry.get("reasons"):
+        print(f"  Rebuilt in the last build because: {', '.join(entry['reasons'])}")
+    else:
+        print("  Skipped in the last build: no inputs changed")
+
+    if os.path.exists(from_path):
+        current = {"hash": hash_file(from_path), "dest": entry["dest"]}
+        reasons = rebuild_reasons(current, entry, global_rebuild_reasons(manifest, hash_file(template_path), basepath, False))
+        print(f"  Next incremental build: {'rebuild because ' + ', '.join(reasons) if reasons else 'up to date'}")
+    else:
+        print("  Next incremental build: the source was removed, the output will be deleted")
+
+    print("  Depends on:")
+    print(f"    markdown {from_path}")
+    print(f"    template {template_path}")
+    for asset in entry.get("assets", []):
+        print(f"    asset    {asset}{'' if asset in manifest.get('static', ()) else ' (missing)'}")
+    for link in entry.get("links", []):
+        print(f"    links to {link}{'' if link in pages else ' (missing)'}")
+    for link in linked_from(pages, from_path):
+        print(f"  Linked from {link}")
+    return 0
+
+def copy_file(src_path, dest_path):
+    dest_dir = os.path.dirname(dest_path)
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir)
+    log(f"Copying file {src_path} to {dest_path}")
+    shutil.copy(src_path, dest_path)
+
+def rebuild_changes(changed, removed, basepath):
+    # Map each changed input onto the smallest amount of work that brings ./docs up to date
+    if "./template.html" in changed:
+        print("Template changed, regenerating all pages")
+        jobs = [(from_path, "./template.html", dest_path, basepath) for from_path, dest_path in collect_pages("./content", "./docs")]
+        return page_errors(generate_pages(jobs))
+
+    errors = {}
+    for path in removed:
+        if path.startswith("./content/") and path.endswith(".md"):
+            remove_output(os.path.join("./docs", os.path.relpath(path, "./content"))[:-3] + ".html", "./docs")
+        elif path.startswith("./static/"):
+            remove_output(os.path.join("./docs", os.path.relpath(path, "./static")), "./docs")
+    for path in changed:
+        if path.startswith("./content/") and path.endswith(".md"):
+            dest_path = os.path.join("./docs", os.path.relpath(path, "./content"))[:-3] + ".html"
+            errors.update(page_errors(generate_pages([(path, "./template.html", dest_path, basepath)])))
+        elif path.startswith("./static/"):
+            copy_file(path, os.path.join("./docs", os.path.relpath(path, "./static")))
+    return errors
+
+def build_search_index(enabled, pages, output_dir, basepath, stats, page_index=None, cache=None):
+    # Returns the index summary for the build report, or None when search is off. page_index holds the
+    # titles and terms collected while rendering; cache is the search cache, if already loaded.
+    cache = load_manifest(SEARCH_CACHE_PATH) if cache is None else cache
+    if not enabled:
+        if cache:
+            save_manifest(remove_search_index(output_dir, cache, stats), SEARCH_CACHE_PATH)
+        return None
+
+    start = time.perf_counter()
+    cache, summary = update_search_index(pages, "./docs", output_dir, basepath, cache, stats, page_index)
+    save_manifest(cache, SEARCH_CACHE_PATH)
+    summary["seconds"] = time.perf_counter() - start
+    print(f"Search index: {summary['pages']} pages, {summary['terms']} terms, {summary['bytes']} bytes, {summary['shards_written']} of {summary['shards']} shards written in {summary['seconds'] * 1000:.1f} ms")
+    return summary
+
+def report_output(stats):
+    print(f"Output: {stats['written']} written, {stats['unchanged']} unchanged, {stats['deleted']} deleted")
+
+def report_errors(errors):
+    for from_path, error in errors.items():
+        print(f"Error generating {from_path}: {error}", file=sys.stderr)
+
+def watch(argv):
+    parser = argparse.ArgumentParser(prog="main.py watch", description="Serve ./docs and rebuild affected pages whenever the sources change")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument("--port", type=int, default=8888, help="port to serve ./docs on")
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between checks for changes")
+    args = parser.parse_args(argv)
+
+    watched = ["./content", "./static", "./template.html"]
+    before = snapshot(watched)
+    configure_block_cache(4096)
+    manifest = load_manifest()
+    manifest["static"] = sync_files("./static", "./docs", manifest.get("static", ()))
+    report_errors(generate_pages_incremental("./content", "./template.html", "./docs", args.basepath or "/", manifest))
+    # Rebuilt pages aren't compressed or indexed, so drop the variants and search index of an earlier build
+    # rather than let them serve stale pages
+    manifest["compressed"] = compress_output("./docs", manifest.get("compressed"), ())
+    build_search_index(False, manifest["pages"], "./docs", args.basepath or "/", Counter())
+    save_manifest(manifest)
+
+    server = serve("./docs", args.port, args.basepath)
+    print(f"Serving ./docs on http://localhost:{args.port}{args.basepath or '/'}, watching for changes")
+    try:
+        while True:
+            time.sleep(args.interval)
+            after = snapshot(watched)
+            changed, removed = diff_snapshots(before, after)
+            before = after
+            if not changed and not removed:
+                continue
+
+            start = time.perf_counter()
+            errors = rebuild_changes(changed, removed, args.basepath or "/")
+            report_errors(errors)
+            print(f"Rebuilt {len(changed) + len(removed)} change(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+def merge(argv):
+    parser = argparse.ArgumentParser(prog="main.py merge", description="Combine the output of a sharded build into one site")
+    parser.add_argument("shards", nargs="+", metavar="SHARD_DIR", help="output directory of each shard, e.g. ./docs.shard-1-of-4")
+    parser.add_argument("--output", default="./docs", help="directory to publish the merged site to")
+    parser.add_argument("--link", action="store_true", help="hardlink files from the shard directories instead of copying them")
+    parser.add_argument("--check-links", action="store_true", help="after merging, report internal links and images that point at nothing")
+    parser.add_argument("--search", action="store_true", help="write a search index for the merged site to search/")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print a line for every copied file")
+    args = parser.parse_args(argv)
+    buildlog.set_quiet(args.quiet)
+
+    manifests = [load_manifest(shard_manifest_path(directory)) for directory in args.shards]
+    problem = check_shard_manifests(manifests)
+    if problem:
+        print(f"Can't merge: {problem}", file=sys.stderr)
+        sys.exit(1)
+
+    # Merge into a staging directory so the published site is never a mix of old and new shards
+    staging_dir = begin_staging(args.output, clone=False)
+    conflicts = merge_outputs(args.shards, staging_dir, args.link)
+    if conflicts:
+        for rel_path in conflicts:
+            print(f"Can't merge: {rel_path} was produced by more than one shard", file=sys.stderr)
+        shutil.rmtree(staging_dir)
+        sys.exit(1)
+    manifest = merge_manifests(manifests)
+    build_search_index(args.search, manifest["pages"], staging_dir, manifest["basepath"], Counter())
+    publish(staging_dir, args.output)
+
+    save_manifest(manifest, MANIFEST_PATH if os.path.normpath(args.output) == "docs" else shard_manifest_path(args.output))
+    print(f"Merged {len(args.shards)} shards, {len(manifest['pages'])} pages, into {args.output}")
+
+    broken = check_links(manifest["pages"], manifest["static"], "./content") if args.check_links else []
+    report_broken_links(broken)
+    if broken:
+        sys.exit(1)
+
+def daemon_output_state(site_dir):
+    # What the daemon wrote to site_dir last time; ./docs starts from the manifest of the last CLI build
+    manifest = load_manifest() if site_dir == "./docs" else {}
+    rendered = {from_path: (None, entry["dest"]) for from_path, entry in manifest.get("pages", {}).items()}
+    return {"manifest": manifest, "static": manifest.get("static", []), "rendered": rendered}
+
+def daemon_build(request, page_cache, outputs):
+    # Builds ./content into the requested output from the parsed pages in page_cache. A page is
+    # serialized again when its markdown, the basepath or the template changed; only changed markdown is parsed.
+    start = time.perf_counter()
+    basepath = request.get("basepath") or "/"
+    site_dir = "./docs" if os.path.normpath(request.get("output", "./docs")) == "docs" else request["output"]
+    state = outputs.get(site_dir) or daemon_output_state(site_dir)
+    stats = Counter()
+    parsed = page_cache.parsed
+
+    state["static"] = sync_files("./static", site_dir, state["static"], stats=stats)
+    template = load_template("./template.html", basepath)
+    template_stamp = os.stat("./template.html").st_mtime_ns
+    writer = FileWriter()
+    errors = {}
+    rendered = {}
+    sources = {}
+    site_pages = collect_pages("./content", site_dir)
+    for from_path, dest_path in site_pages:
+        try:
+            page = page_cache.get(from_path)
+            stamp = (page.stamp, basepath, template_stamp)
+            if state["rendered"].get(from_path) == (stamp, dest_path) and os.path.exists(dest_path):
+                stats["unchanged"] += 1
+            else:
+                log(f"Generating page from {from_path} to {dest_path} from the parsed page")
+                writer.write(dest_path, template.iter_render({"Title": escape_text(page.title), "Content": iter_page_html(page, basepath)}))
+                stats["unchanged" if dest_path in writer.unchanged else "written"] += 1
+        except Exception as e:
+            # A failed page keeps its last good output and its previous entry, whose stamp no longer
+            # matches, so the next request tries it again
+            errors[from_path] = f"{type(e).__name__}: {e}"
+            if from_path in state["rendered"]:
+                rendered[from_path] = state["rendered"][from_path]
+            continue
+        rendered[from_path] = (stamp, dest_path)
+        sources[from_path] = page
+
+    dest_paths = {dest_path for _, dest_path in rendered.values()}
+    for from_path, (_, dest_path) in state["rendered"].items():
+        if from_path not in rendered and from_path not in errors and dest_path not in dest_paths and remove_output(dest_path, site_dir):
+            stats["deleted"] += 1
+    page_cache.prune(from_path for from_path, _ in site_pages)
+    state["rendered"] = rendered
+    outputs[site_dir] = state
+
+    if site_dir == "./docs":
+        # Keep the manifest current so incremental CLI builds, --explain and --check-links see what the daemon wrote
+        manifest = state["manifest"]
+        old_pages = manifest.get("pages", {})
+        template_hash = hash_file("./template.html")
+        global_reasons = global_rebuild_reasons(manifest, template_hash, basepath, False)
+        resolver = DependencyResolver("./content", state["static"], sources)
+        pages = {}
+        for from_path, page in sources.items():
+            entry = {"hash": page.digest, "dest": rendered[from_path][1]}
+            entry["reasons"] = rebuild_reasons(entry, old_pages.get(from_path), global_reasons)
+            entry.update(resolver.page_dependencies(page.refs))
+            entry["refs"] = page.refs
+            pages[from_path] = entry
+        manifest.update({"template": template_hash, "basepath": basepath, "asset_urls": {}, "static": state["static"], "pages": pages})
+        # The daemon doesn't compress or index, so variants and a search index from a CLI build would serve the old pages
+        manifest["compressed"] = compress_output(site_dir, manifest.get("compressed"), (), stats=stats)
+        build_search_index(False, pages, site_dir, basepath, stats)
+        save_manifest(manifest)
+
+    return {
+        "errors": errors,
+        "stats": dict(stats),
+        "pages": len(sources),
+        "parsed": page_cache.parsed - parsed,
+        "seconds": time.perf_counter() - start,
+    }
+
+def daemon(argv):
+    parser = argparse.ArgumentParser(prog="main.py daemon", description="Keep parsed pages in memory and build the site whenever a request arrives on a Unix socket")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="path of the Unix socket to listen on")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print a line for every copied file and generated page")
+    args = parser.parse_args(argv)
+    buildlog.set_quiet(args.quiet)
+
+    page_cache = PageCache()
+    outputs = {}
+    try:
+        server = start_server(lambda request: daemon_build(request, page_cache, outputs), args.socket)
+    except OSError as e:
+        print(f"Can't start the build daemon: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Build daemon listening on {args.socket}")
+    try:
+        server.serve_until_stopped()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(args.socket)
+
+def request(argv):
+    parser = argparse.ArgumentParser(prog="main.py request", description="Ask a running build daemon to build the site")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument("--output", default="./docs", help="directory to build the site into")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="path of the daemon's Unix socket")
+    parser.add_argument("--stop", action="store_true", help="stop the daemon instead of building")
+    args = parser.parse_args(argv)
+
+    try:
+        response = send_request({"stop": True} if args.stop else {"basepath": args.basepath or "/", "output": args.output}, args.socket)
+    except OSError as e:
+        print(f"Can't reach the build daemon on {args.socket}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if response.get("error"):
+        print(f"Build failed: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+    if args.stop:
+        print("Build daemon stopped")
+        return
+
+    print(f"Built {response['pages']} pages into {args.output}, {response['parsed']} parsed, in {response['seconds'] * 1000:.1f} ms")
+    report_output(Counter(response["stats"]))
+    report_errors(response["errors"])
+    if response["errors"]:
+        sys.exit(1)
+
+COMMANDS = {
+    "watch": watch,
+    "merge": merge,
+    "daemon": daemon,
+    "request": request,
+}
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site from ./content into ./docs")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument("--incremental", action="store_true", help="only regenerate pages whose inputs changed since the last build")
+    parser.add_argument("--sync", action="store_true", help="copy only changed static files instead of recreating ./docs")
+    parser.add_argument("--hash", action="store_true", help="with --sync, compare file contents when sizes match but mtimes differ")
+    parser.add_argument("--link", action="store_true", help="with --sync, hardlink static files instead of copying them")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes used to render pages")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print a line for every copied file and generated page")
+    parser.add_argument("--profile", nargs="?", const="profile.json", metavar="REPORT", help="time each build phase per page, count the bytes it allocates with tracemalloc (which slows the build down) and write a JSON report (default: profile.json)")
+    parser.add_argument("--block-cache", type=int, default=4096, metavar="N", help="rendered blocks kept in memory per process, 0 to disable")
+    parser.add_argument("--block-cache-dir", metavar="DIR", help="also keep rendered blocks on disk in DIR so they survive between builds")
+    parser.add_argument("--renderer", choices=sorted(RENDERERS), default="direct", help="write block HTML straight from the inline tokens (direct) or through the HTMLNode tree (tree); both give identical output")
+    parser.add_argument("--fingerprint", action="store_true", help="also write static files under content-hashed names, with an asset manifest, and link pages to those")
+    parser.add_argument("--compress", action="store_true", help="write .gz siblings (and .br, if the brotli module is installed) for pages and text assets, using --jobs processes")
+    parser.add_argument("--search", action="store_true", help="write a client-side search index to search/, re-tokenizing only changed pages")
+    parser.add_argument("--shard", metavar="K/N", help="build only the K-th of N deterministic slices of the pages into ./docs.shard-K-of-N; shard 1 also copies ./static")
+    parser.add_argument("--atomic", action="store_true", help="build into a staging copy of ./docs, writing pages on a background thread, and swap it in when done")
+    parser.add_argument("--check-links", action="store_true", help="after building, report internal links and images that point at nothing")
+    parser.add_argument("--explain", metavar="PAGE", help="show why PAGE was rebuilt and what it depends on, without building")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N", help="number of slowest pages to list after a profiled build")
+    args = parser.parse_args(argv)
+    if args.basepath == "":
+        args.basepath = "/"
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.check_links or args.search:
+            parser.error("--check-links and --search need every page, pass them to the merge command instead")
+    return args
 
 def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else None
-    if basepath == None or basepath == "":
-        basepath = "/"
-    
-    copy_files("./static", "./docs")
-    generate_pages_recursive("./content", "./template.html", "./docs", basepath)
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]](sys.argv[2:])
+
+    args = parse_args(sys.argv[1:])
+    if args.explain:
+        sys.exit(explain(args.explain, args.basepath))
+    buildlog.set_quiet(args.quiet)
+    configure_block_cache(args.block_cache, args.block_cache_dir)
+    set_renderer(args.renderer)
+
+    # A shard builds into its own directory and keeps its manifest next to it; pages are still
+    # recorded under ./docs so the shard manifests merge into the manifest of a normal build
+    site_dir = shard_dir(args.shard) if args.shard else "./docs"
+    manifest_path = shard_manifest_path(site_dir) if args.shard else MANIFEST_PATH
+    manifest = load_manifest(manifest_path)
+    if args.shard and manifest.get("shard") != list(args.shard):
+        manifest = {}
+    static_shard = not args.shard or args.shard[0] == 1
+
+    # Only builds that keep existing output need the staging tree to start as a copy of the site
+    output_dir = begin_staging(site_dir, clone=args.incremental or args.sync) if args.atomic else site_dir
+    stats = Counter()
+    static_start = time.perf_counter()
+    if not static_shard:
+        if not args.incremental and os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        # Other shards still need the file list to resolve references to static files
+        manifest["static"] = list_files("./static")
+    elif args.sync:
+        manifest["static"] = sync_files("./static", output_dir, manifest.get("static", ()), args.hash, args.link, stats)
+    else:
+        copy_files("./static", output_dir, clean=not args.incremental, stats=stats)
+        manifest["static"] = list_files("./static")
+    if args.fingerprint:
+        manifest["asset_hashes"] = hash_assets("./static", manifest.get("asset_hashes"))
+    hashes = manifest["asset_hashes"] if args.fingerprint else {}
+    # Every shard rewrites URLs to the fingerprinted names, only the static shard writes the files
+    set_asset_urls(asset_urls(hashes))
+    # Runs without --fingerprint too, so copies left by an earlier fingerprinted build are removed
+    manifest["fingerprinted"] = copy_fingerprinted("./static", output_dir, hashes if static_shard else {}, manifest.get("fingerprinted", ()), args.link, stats)
+    static_seconds = time.perf_counter() - static_start
+
+    # Full builds still record the manifest so a later incremental build starts from a known state
+    profiles = {} if args.profile else None
+    search_cache = load_manifest(SEARCH_CACHE_PATH) if args.search else None
+    page_index = {} if args.search else None
+    options = BuildOptions(
+        output_dir=output_dir,
+        background=args.atomic,
+        stats=stats,
+        shard=args.shard,
+        profiles=profiles,
+        indexed=indexed_pages(search_cache) if args.search else None,
+        page_index=page_index,
+    )
+    errors = generate_pages_incremental("./content", "./template.html", "./docs", args.basepath, manifest, force=not args.incremental, workers=args.jobs, options=options)
+    search = build_search_index(args.search, manifest["pages"], output_dir, args.basepath, stats, page_index, search_cache) if not args.shard else None
+    encodings = available_encodings() if args.compress else ()
+    # Runs without --compress too, so variants left by an earlier compressed build are removed
+    manifest["compressed"] = compress_output(output_dir, manifest.get("compressed"), encodings, args.jobs, stats)
+    if args.atomic:
+        publish(output_dir, site_dir)
+    if args.shard:
+        manifest["shard"] = list(args.shard)
+    save_manifest(manifest, manifest_path)
+    report_output(stats)
+
+    if args.profile:
+        report = build_report(profiles, static_seconds, search)
+        write_report(report, args.profile)
+        print_summary(report, args.profile_top)
+        print(f"Wrote profile report to {args.profile}")
+    broken = check_links(manifest["pages"], manifest["static"], "./content") if args.check_links else []
+    report_broken_links(broken)
+
+    if errors:
+        report_errors(errors)
+    if errors or broken:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
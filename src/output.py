@@ -0,0 +1,150 @@
+import os
+import shutil
+import queue
+import ctypes
+import threading
+
+from manifest import hash_file
+from log import log
+
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+class ReplacementFile:
+    # Write beside the target and rename over it, so readers and hardlinked copies
+    # only ever see the old file or the complete new one. A file whose contents didn't
+    # change is left alone so its mtime doesn't push it through rsync and CDN invalidation.
+    def __init__(self, path, mode="w", skip_unchanged=True):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.mode = mode
+        self.skip_unchanged = skip_unchanged
+        self.changed = None
+
+    def __enter__(self):
+        self.file = open(self.tmp_path, self.mode)
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None and self.skip_unchanged and same_contents(self.tmp_path, self.path):
+            self.changed = False
+        elif exc_type is None:
+            os.replace(self.tmp_path, self.path)
+            self.changed = True
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        return False
+
+def same_contents(new_path, path):
+    # Sizes settle most comparisons without reading the existing file
+    if not os.path.exists(path) or os.path.getsize(new_path) != os.path.getsize(path):
+        return False
+    return hash_file(new_path) == hash_file(path)
+
+def make_dirs(paths):
+    # One makedirs per distinct directory instead of an exists check per file
+    dir_paths = {os.path.dirname(path) for path in paths}
+    for dir_path in sorted(dir_paths):
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+    return dir_paths
+
+def relocate(path, root, new_root):
+    return os.path.join(new_root, os.path.relpath(path, root))
+
+def staging_path(dest_dir):
+    return os.path.normpath(dest_dir) + ".staging"
+
+def begin_staging(dest_dir, clone=True):
+    # The staging tree starts as a hardlinked copy of the live one, which costs a link per file
+    # and no data. Everything that writes into it must replace files rather than rewrite them.
+    staging_dir = staging_path(dest_dir)
+    if os.path.exists(staging_dir):
+        # Left over from a build that crashed before publishing
+        shutil.rmtree(staging_dir)
+    if clone and os.path.isdir(dest_dir):
+        shutil.copytree(dest_dir, staging_dir, copy_function=os.link)
+    else:
+        os.makedirs(staging_dir)
+    return staging_dir
+
+def exchange_paths(a, b):
+    # Swap two directories in a single rename where the kernel supports it (Linux renameat2)
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    return renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0
+
+def publish(staging_dir, dest_dir):
+    log(f"Publishing {staging_dir} to {dest_dir}")
+    if not os.path.exists(dest_dir):
+        os.rename(staging_dir, dest_dir)
+        return
+    if exchange_paths(staging_dir, dest_dir):
+        # The staging path now holds the previous build
+        shutil.rmtree(staging_dir)
+        return
+
+    # Without an exchange there is a moment where dest_dir is missing, but never one where it is half built
+    old_dir = os.path.normpath(dest_dir) + ".old"
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    os.rename(dest_dir, old_dir)
+    os.rename(staging_dir, dest_dir)
+    shutil.rmtree(old_dir)
+
+class FileWriter:
+    # Writes on the calling thread, streaming the chunks straight into the file
+    def __init__(self, created_dirs=()):
+        self.created_dirs = set(created_dirs)
+        self.unchanged = set()
+
+    def write(self, path, chunks):
+        self.write_file(path, chunks)
+
+    def write_file(self, path, chunks):
+        dir_path = os.path.dirname(path)
+        if dir_path not in self.created_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self.created_dirs.add(dir_path)
+        replacement = ReplacementFile(path)
+        with replacement as f:
+            f.writelines(chunks)
+        if not replacement.changed:
+            self.unchanged.add(path)
+
+    def close(self):
+        return {}
+
+class OutputWriter(FileWriter):
+    # Writes finished pages on a background thread so the next page renders while this one hits the disk.
+    # The queue is bounded so a slow disk holds back rendering instead of buffering the whole site.
+    def __init__(self, created_dirs=(), max_pending=64):
+        super().__init__(created_dirs)
+        self.queue = queue.Queue(max_pending)
+        self.errors = {}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self, path, chunks):
+        self.queue.put((path, list(chunks)))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            path, chunks = item
+            try:
+                self.write_file(path, chunks)
+            except OSError as e:
+                self.errors[path] = f"{type(e).__name__}: {e}"
+
+    def close(self):
+        # Waits for every queued write and returns {path: error} for the ones that failed
+        self.queue.put(None)
+        self.thread.join()
+        return self.errors
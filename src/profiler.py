@@ -0,0 +1,70 @@
+import json
+import time
+import tracemalloc
+
+# inline and to_html are the tree renderer's phases, block_to_html is where the direct renderer does both
+PAGE_PHASES = ["read", "markdown_to_blocks", "block_to_block_type", "inline", "block_to_html", "to_html", "template", "write"]
+
+class NullProfiler:
+    def measure(self, phase, func, *args):
+        return func(*args)
+
+    def __bool__(self):
+        return False
+
+
+class PageProfiler:
+    def __init__(self):
+        # {phase: [seconds, bytes allocated]}. Each call adds the most memory it held at once above what was
+        # allocated when it started, as tracemalloc sees it; tracing slows every phase down, so compare
+        # profiled timings with each other rather than with unprofiled builds
+        self.phases = {phase: [0.0, 0] for phase in PAGE_PHASES}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def measure(self, phase, func, *args):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        totals = self.phases[phase]
+        totals[0] += seconds
+        totals[1] += tracemalloc.get_traced_memory()[1] - before
+        return result
+
+    def to_dict(self):
+        phases = {phase: {"seconds": seconds, "allocated_bytes": allocated} for phase, (seconds, allocated) in self.phases.items()}
+        return {"total": sum(seconds for seconds, _ in self.phases.values()), "phases": phases}
+
+
+NULL_PROFILER = NullProfiler()
+
+def build_report(pages, static_seconds, search=None):
+    phases = {phase: {"seconds": 0.0, "allocated_bytes": 0} for phase in PAGE_PHASES}
+    for page in pages.values():
+        for phase, totals in page["phases"].items():
+            phases[phase]["seconds"] += totals["seconds"]
+            phases[phase]["allocated_bytes"] += totals["allocated_bytes"]
+    report = {"static": {"seconds": static_seconds}, "phases": phases, "pages": pages}
+    if search:
+        report["search"] = search
+    return report
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+
+def print_summary(report, top=10):
+    print(f"Static copy: {report['static']['seconds'] * 1000:.1f} ms")
+    if "search" in report:
+        print(f"Search index: {report['search']['seconds'] * 1000:.1f} ms, {report['search']['bytes']} bytes")
+    print("Page phases:")
+    for phase, totals in report["phases"].items():
+        print(f"  {phase:<20} {totals['seconds'] * 1000:>10.1f} ms {totals['allocated_bytes'] / 1024:>12.1f} KiB allocated")
+
+    slowest = sorted(report["pages"].items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+    print(f"Slowest {len(slowest)} pages:")
+    for path, page in slowest:
+        phase = max(page["phases"], key=lambda name: page["phases"][name]["seconds"])
+        print(f"  {page['total'] * 1000:>10.1f} ms  {path} (mostly {phase})")
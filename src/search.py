@@ -0,0 +1,124 @@
+import os
+import json
+from collections import Counter
+
+from htmlnode import rewrite_url
+from textnodeparser import MarkdownSource, blocks_to_html_chunks, extract_title
+from output import ReplacementFile
+from sync import remove_output
+
+SEARCH_CACHE_PATH = "./.cache/search.json"
+# Bump when the tokenizer or the cache layout changes so cached token lists are rebuilt
+SEARCH_VERSION = 2
+SEARCH_DIR = "search"
+
+def index_page(from_path):
+    # {"title", "terms"} for a page the build didn't render, e.g. after merging shards. Streams the page
+    # through the same renderer and tokenizer a build uses.
+    terms = Counter()
+    with MarkdownSource(from_path) as src:
+        title = extract_title(src.first_line())
+        for _ in blocks_to_html_chunks(src.iter_blocks(), terms=terms):
+            pass
+    return {"title": title, "terms": terms}
+
+def indexed_pages(cache):
+    # {from_path: hash} of the pages cache already has token lists for
+    if cache.get("version") != SEARCH_VERSION:
+        return {}
+    return {from_path: record["hash"] for from_path, record in cache.get("pages", {}).items()}
+
+def term_shard(term):
+    # Clients fetch only the shard for the first character of the term they look up
+    return term[0] if term[0] in "abcdefghijklmnopqrstuvwxyz0123456789" else "_"
+
+def shard_path(output_dir, shard):
+    return os.path.join(output_dir, SEARCH_DIR, f"terms-{shard}.json")
+
+def page_url(dest_path, dest_dir, basepath):
+    url = "/" + os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+    return rewrite_url(url, basepath)
+
+def write_json(path, data, stats):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    replacement = ReplacementFile(path)
+    with replacement as f:
+        json.dump(data, f, separators=(",", ":"), sort_keys=True)
+    stats["written" if replacement.changed else "unchanged"] += 1
+
+def update_search_index(pages, dest_dir, output_dir, basepath, cache, stats=None, page_index=None):
+    # Writes search/pages.json ({id: [url, title]}) and search/terms-<c>.json ({term: [[id, count], ...]})
+    # under output_dir. page_index holds {from_path: {"title", "terms"}} collected while the build rendered
+    # pages; a changed page missing from it is tokenized on its own. Only shards holding a term whose count
+    # changed are written. Returns the cache for the next build and a summary for the build report.
+    stats = Counter() if stats is None else stats
+    page_index = page_index or {}
+    if cache.get("version") != SEARCH_VERSION:
+        cache = {}
+    old_pages = cache.get("pages", {})
+    next_id = cache.get("next_id", 0)
+
+    records = {}
+    touched = set()
+    pages_changed = set(old_pages) != set(pages)
+    for from_path, entry in sorted(pages.items()):
+        url = page_url(entry["dest"], dest_dir, basepath)
+        old = old_pages.get(from_path)
+        if old and old["hash"] == entry["hash"]:
+            record = dict(old, url=url)
+        else:
+            index = page_index.get(from_path) or index_page(from_path)
+            record = {"hash": entry["hash"], "url": url, "title": index["title"], "terms": dict(index["terms"])}
+            if old:
+                # Only terms whose count moved change a posting list
+                record["id"] = old["id"]
+                touched.update(term for term in old["terms"].keys() | record["terms"].keys() if old["terms"].get(term) != record["terms"].get(term))
+            else:
+                record["id"] = next_id
+                next_id += 1
+                touched.update(record["terms"])
+        pages_changed = pages_changed or not old or (old["url"], old["title"]) != (record["url"], record["title"])
+        records[from_path] = record
+    for from_path in old_pages.keys() - records.keys():
+        touched.update(old_pages[from_path]["terms"])
+
+    # Rebuilding postings from the token lists is cheap next to tokenizing; the files are what we avoid rewriting
+    postings = {}
+    for record in records.values():
+        for term, count in record["terms"].items():
+            postings.setdefault(term_shard(term), {}).setdefault(term, []).append([record["id"], count])
+    touched_shards = {term_shard(term) for term in touched}
+    shards_written = 0
+    for shard, terms in postings.items():
+        if shard in touched_shards or not os.path.exists(shard_path(output_dir, shard)):
+            write_json(shard_path(output_dir, shard), {term: sorted(ids) for term, ids in terms.items()}, stats)
+            shards_written += 1
+    for shard in cache.get("shards", []):
+        if shard not in postings and remove_output(shard_path(output_dir, shard), output_dir):
+            stats["deleted"] += 1
+
+    pages_path = os.path.join(output_dir, SEARCH_DIR, "pages.json")
+    if pages_changed or not os.path.exists(pages_path):
+        write_json(pages_path, {str(record["id"]): [record["url"], record["title"]] for record in records.values()}, stats)
+
+    paths = [pages_path] + [shard_path(output_dir, shard) for shard in postings]
+    summary = {
+        "pages": len(records),
+        "terms": sum(len(terms) for terms in postings.values()),
+        "shards": len(postings),
+        "shards_written": shards_written,
+        "bytes": sum(os.path.getsize(path) for path in paths),
+    }
+    cache = {"version": SEARCH_VERSION, "next_id": next_id, "shards": sorted(postings), "pages": records}
+    return cache, summary
+
+def remove_search_index(output_dir, cache, stats=None):
+    # Deletes what an earlier --search build wrote and returns the emptied cache
+    stats = Counter() if stats is None else stats
+    paths = [os.path.join(output_dir, SEARCH_DIR, "pages.json")] + [shard_path(output_dir, shard) for shard in cache.get("shards", [])]
+    for path in paths if cache else []:
+        if remove_output(path, output_dir):
+            stats["deleted"] += 1
+    return {}
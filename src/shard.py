@@ -0,0 +1,77 @@
+import os
+import hashlib
+
+from sync import list_files, transfer_file
+from log import log
+
+def parse_shard(spec):
+    # "K/N" with 1 <= K <= N, returned as (K, N)
+    try:
+        k, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"invalid shard {spec!r}, expected K/N") from None
+    if n < 1 or not 1 <= k <= n:
+        raise ValueError(f"invalid shard {spec!r}, K must be between 1 and N")
+    return (k, n)
+
+def shard_of(from_path, shard_count):
+    # Hash the content path rather than relying on listing order, so every machine agrees and
+    # adding a page only moves that page
+    digest = hashlib.sha256(os.path.normpath(from_path).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count + 1
+
+def shard_pages(pages, shard):
+    # Keeps the (from_path, dest_path) pairs that belong to shard (K, N); None keeps them all
+    if shard is None:
+        return pages
+    k, n = shard
+    return [page for page in pages if shard_of(page[0], n) == k]
+
+def shard_dir(shard, dest_dir="./docs"):
+    return f"{os.path.normpath(dest_dir)}.shard-{shard[0]}-of-{shard[1]}"
+
+def shard_manifest_path(output_dir):
+    # Kept next to the shard's output rather than in it, so it is never published or compressed
+    return os.path.normpath(output_dir) + ".json"
+
+def check_shard_manifests(manifests):
+    # Returns a description of what is wrong with the set of shard manifests, or None
+    shards = [tuple(manifest.get("shard") or ()) for manifest in manifests]
+    if any(len(shard) != 2 for shard in shards):
+        return "not every directory was built with --shard"
+    counts = {n for _, n in shards}
+    if len(counts) != 1:
+        return "shards were built with different shard counts"
+    n = counts.pop()
+    missing = sorted(set(range(1, n + 1)) - {k for k, _ in shards})
+    if missing or len(shards) != n:
+        return f"expected shards 1 to {n} exactly once, missing {', '.join(map(str, missing)) or 'none'}"
+    for key in ("template", "basepath", "asset_urls"):
+        if len({repr(manifest.get(key)) for manifest in manifests}) != 1:
+            return f"shards were built with different {key.replace('_', ' ')}s"
+    return None
+
+def merge_manifests(manifests):
+    # Pages and compressed files are split between shards; static files belong to shard 1 alone
+    static = next(manifest for manifest in manifests if manifest["shard"][0] == 1)
+    merged = {key: static[key] for key in ("template", "basepath", "asset_urls", "static", "asset_hashes", "fingerprinted") if key in static}
+    merged["pages"] = {}
+    merged["compressed"] = {}
+    for manifest in manifests:
+        merged["pages"].update(manifest.get("pages", {}))
+        merged["compressed"].update(manifest.get("compressed", {}))
+    return merged
+
+def merge_outputs(shard_dirs, dest, link=False):
+    # Copies every shard's files into dest and returns the paths that more than one shard produced
+    owners = {}
+    conflicts = []
+    for directory in shard_dirs:
+        for rel_path in list_files(directory):
+            if rel_path in owners:
+                conflicts.append(rel_path)
+                continue
+            owners[rel_path] = directory
+            log(f"Copying file {os.path.join(directory, rel_path)} to {os.path.join(dest, rel_path)}")
+            transfer_file(os.path.join(directory, rel_path), os.path.join(dest, rel_path), link)
+    return conflicts
@@ -0,0 +1,80 @@
+import os
+import shutil
+from collections import Counter
+
+from manifest import hash_file
+from log import log
+
+def remove_output(dest_path, dest_root):
+    # Returns whether there was a file to remove
+    removed = os.path.exists(dest_path)
+    if removed:
+        log(f"Removing {dest_path}")
+        os.remove(dest_path)
+
+    # Prune directories left empty by the removal, but never the output root
+    dest_dir = os.path.dirname(dest_path)
+    while os.path.abspath(dest_dir) != os.path.abspath(dest_root) and os.path.isdir(dest_dir) and not os.listdir(dest_dir):
+        os.rmdir(dest_dir)
+        dest_dir = os.path.dirname(dest_dir)
+    return removed
+
+def list_files(root, path=""):
+    files = []
+    for entry in sorted(os.scandir(os.path.join(root, path)), key=lambda entry: entry.name):
+        rel_path = os.path.join(path, entry.name)
+        if entry.is_dir():
+            files.extend(list_files(root, rel_path))
+        else:
+            files.append(rel_path)
+    return files
+
+def needs_copy(src_path, dest_path, use_hash):
+    if not os.path.exists(dest_path):
+        return True
+    src_stat = os.stat(src_path)
+    dest_stat = os.stat(dest_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return False
+    # Same size but a different mtime, e.g. after a fresh checkout; only the content can settle it
+    return not use_hash or hash_file(src_path) != hash_file(dest_path)
+
+def transfer_file(src_path, dest_path, link):
+    dest_dir = os.path.dirname(dest_path)
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir)
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if link:
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            # Cross-device or unsupported filesystem, fall back to copying
+            pass
+    # copy2 keeps the mtime, which is what lets the next sync skip the file, and
+    # uses sendfile for the data on Linux
+    shutil.copy2(src_path, dest_path)
+
+def sync_files(src, dest, previous=(), use_hash=False, link=False, stats=None):
+    # Only files this function copied before (previous) are ever deleted, so generated pages in dest are safe.
+    # stats, if given, counts files written, left unchanged and deleted.
+    stats = Counter() if stats is None else stats
+    files = list_files(src)
+    for rel_path in files:
+        src_path = os.path.join(src, rel_path)
+        dest_path = os.path.join(dest, rel_path)
+        if needs_copy(src_path, dest_path, use_hash):
+            log(f"Copying file {src_path} to {dest_path}")
+            transfer_file(src_path, dest_path, link)
+            stats["written"] += 1
+        else:
+            stats["unchanged"] += 1
+
+    current = set(files)
+    for rel_path in previous:
+        if rel_path not in current and remove_output(os.path.join(dest, rel_path), dest):
+            stats["deleted"] += 1
+    return files
@@ -0,0 +1,56 @@
+import os
+import re
+
+import htmlnode
+from htmlnode import URL_ATTRIBUTES, rewrite_url
+
+SLOT_RE = re.compile(r"\{\{ (\w+) \}\}")
+URL_ATTRIBUTE_RE = re.compile(r'\b(' + "|".join(URL_ATTRIBUTES) + r')="([^"]*)"')
+
+_templates = {}
+
+class Template:
+    def __init__(self, segments):
+        # Literal text at even indexes, slot names at odd indexes
+        self.segments = segments
+
+    def iter_render(self, values):
+        for i, segment in enumerate(self.segments):
+            if i % 2 == 0:
+                yield segment
+            elif segment not in values:
+                yield f"{{{{ {segment} }}}}"
+            elif isinstance(values[segment], str):
+                yield values[segment]
+            else:
+                yield from values[segment]
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def __repr__(self):
+        return f"Template({self.segments})"
+
+
+def compile_template(source, basepath=None):
+    # Literal segments get the basepath rewrite once here; slot values are expected to be rewritten already
+    segments = SLOT_RE.split(source)
+    for i in range(0, len(segments), 2):
+        segments[i] = URL_ATTRIBUTE_RE.sub(lambda match: f'{match.group(1)}="{rewrite_url(match.group(2), basepath)}"', segments[i])
+    return Template(segments)
+
+def template_urls(source):
+    # URLs the template's literal text links to, before any rewrite
+    return {match.group(2) for segment in SLOT_RE.split(source)[::2] for match in URL_ATTRIBUTE_RE.finditer(segment)}
+
+def load_template(path, basepath=None):
+    mtime = os.stat(path).st_mtime_ns
+    key = (path, basepath, htmlnode.ASSET_URLS_KEY)
+    cached = _templates.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r") as f:
+        template = compile_template(f.read(), basepath)
+    _templates[key] = (mtime, template)
+    return template
@@ -0,0 +1,17 @@
+import re
+from html import unescape
+
+TERM_RE = re.compile(r"\w\w+")
+TAG_RE = re.compile(r"<[^>]*>")
+ALT_RE = re.compile(r'\balt="([^"]*)"')
+
+def count_terms(html, terms):
+    # Adds the words a rendered block shows to the terms Counter: the text between tags and image alt text.
+    # Text and attribute values are escaped, so a literal < or > never splits them.
+    for text in TAG_RE.split(html):
+        if text:
+            terms.update(TERM_RE.findall(unescape(text).lower()))
+    for tag in TAG_RE.findall(html):
+        alt = ALT_RE.search(tag)
+        if alt:
+            terms.update(TERM_RE.findall(unescape(alt.group(1)).lower()))
@@ -0,0 +1,61 @@
+import os
+import json
+import unittest
+from collections import Counter
+
+from assets import ASSET_MANIFEST, asset_urls, changed_asset_urls, copy_fingerprinted, fingerprint_path, hash_assets
+from fixtures import write, TempDirTestCase
+
+
+class TestAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        write(os.path.join(self.src, "index.css"), "body {}")
+        write(os.path.join(self.src, "images", "tom.png"), "png")
+        os.makedirs(self.dest)
+
+    def test_fingerprint_path_eq(self):
+        self.assertEqual(fingerprint_path("index.css", "0123456789abcdef"), "index.0123456789.css")
+        self.assertEqual(fingerprint_path("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_hash_assets_reuses_matching_entries_eq(self):
+        hashes = hash_assets(self.src)
+        self.assertEqual(sorted(hashes), [os.path.join("images", "tom.png"), "index.css"])
+
+        # A cached entry with the same size and mtime is trusted without reading the file
+        hashes["index.css"]["hash"] = "cached"
+        self.assertEqual(hash_assets(self.src, hashes)["index.css"]["hash"], "cached")
+        write(os.path.join(self.src, "index.css"), "body { color: red; }")
+        self.assertNotEqual(hash_assets(self.src, hashes)["index.css"]["hash"], "cached")
+
+    def test_asset_urls_eq(self):
+        urls = asset_urls({os.path.join("images", "tom.png"): {"hash": "0123456789abcdef"}})
+        self.assertEqual(urls, {"/images/tom.png": "/images/tom.0123456789.png"})
+        self.assertEqual(changed_asset_urls(urls, {}), {"/images/tom.png"})
+        self.assertEqual(changed_asset_urls(urls, dict(urls)), set())
+
+    def test_copy_fingerprinted_eq(self):
+        hashes = hash_assets(self.src)
+        stats = Counter()
+        written = copy_fingerprinted(self.src, self.dest, hashes, stats=stats)
+        css = fingerprint_path("index.css", hashes["index.css"]["hash"])
+        self.assertIn(css, written)
+        self.assertEqual(stats, {"written": 3})
+        with open(os.path.join(self.dest, ASSET_MANIFEST)) as f:
+            self.assertEqual(json.load(f)["index.css"], css)
+
+        write(os.path.join(self.src, "index.css"), "body { color: red; }")
+        stats = Counter()
+        written = copy_fingerprinted(self.src, self.dest, hash_assets(self.src, hashes), written, stats=stats)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, css)))
+        self.assertEqual(stats, {"written": 2, "unchanged": 1, "deleted": 1})
+
+        # Turning fingerprinting off removes everything it wrote
+        copy_fingerprinted(self.src, self.dest, {}, written)
+        self.assertEqual(os.listdir(self.dest), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
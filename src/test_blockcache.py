@@ -0,0 +1,50 @@
+import os
+import unittest
+import tempfile
+
+from blockcache import BlockCache
+from textnodeparser import markdown_to_html_chunks, markdown_to_htmlnode
+
+MARKDOWN = "# Title\n\nSome **bold** text and a [link](/blog/tom)\n\n- one\n- two\n\nSome **bold** text and a [link](/blog/tom)"
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction_eq(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", ("<p>a</p>", []))
+        cache.put("b", ("<p>b</p>", []))
+        cache.get("a")
+        cache.put("c", ("<p>c</p>", []))
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+
+    def test_key_not_eq(self):
+        cache = BlockCache()
+        self.assertNotEqual(cache.key("paragraph", "text", "/"), cache.key("heading", "text", "/"))
+        self.assertNotEqual(cache.key("paragraph", "text", "/"), cache.key("paragraph", "text", "/site/"))
+
+    def test_disk_store_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            BlockCache(directory=tmp).put("abcdef", ("<p>a</p>", [("link", "/blog/tom")]))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "ab", "cdef.json")))
+            cache = BlockCache(directory=tmp)
+            self.assertEqual(cache.get("abcdef"), ("<p>a</p>", [("link", "/blog/tom")]))
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+
+class TestMarkdownToHtmlChunks(unittest.TestCase):
+    def test_matches_tree_eq(self):
+        expected = markdown_to_htmlnode(MARKDOWN).to_html("/site/")
+        self.assertEqual("".join(markdown_to_html_chunks(MARKDOWN, "/site/")), expected)
+
+    def test_cached_eq(self):
+        cache = BlockCache()
+        expected = markdown_to_htmlnode(MARKDOWN).to_html("/site/")
+        self.assertEqual("".join(markdown_to_html_chunks(MARKDOWN, "/site/", cache)), expected)
+        self.assertEqual("".join(markdown_to_html_chunks(MARKDOWN, "/site/", cache)), expected)
+        # The repeated paragraph already hits on the first pass
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import gzip
+import unittest
+from collections import Counter
+
+from compress import MIN_SIZE, compress_file, compress_output
+from fixtures import write, TempDirTestCase
+
+
+class TestCompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        self.page = os.path.join(self.root, "blog", "index.html")
+        write(self.page, "<p>Tom Bombadil</p>\n" * 100)
+        write(os.path.join(self.root, "index.css"), "body {}")
+        write(os.path.join(self.root, "images", "tom.png"), "png" * MIN_SIZE)
+
+    def test_compress_file_eq(self):
+        self.assertEqual(compress_file((self.page, (".gz",))), ([".gz"], 1, 0))
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>Tom Bombadil</p>\n" * 100)
+
+        # Incompressible content loses the variant it had
+        with open(self.page, "wb") as f:
+            f.write(os.urandom(MIN_SIZE * 2))
+        self.assertEqual(compress_file((self.page, (".gz",))), ([], 0, 1))
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+    def test_compress_output_eq(self):
+        stats = Counter()
+        compressed = compress_output(self.root, None, (".gz",), stats=stats)
+        # Small files and other file types are left alone
+        self.assertEqual(sorted(compressed), [os.path.join("blog", "index.html"), "index.css"])
+        self.assertEqual(compressed["index.css"]["variants"], [])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "images", "tom.png.gz")))
+        self.assertEqual(stats, Counter({"written": 1}))
+
+        os.utime(self.page + ".gz", ns=(1, 1))
+        stats = Counter()
+        compressed = compress_output(self.root, compressed, (".gz",), stats=stats)
+        self.assertEqual(os.stat(self.page + ".gz").st_mtime_ns, 1)
+        self.assertEqual(stats, Counter({"unchanged": 1}))
+
+        write(self.page, "<p>Goldberry</p>\n" * 100)
+        stats = Counter()
+        compressed = compress_output(self.root, compressed, (".gz",), stats=stats)
+        self.assertEqual(stats, Counter({"written": 1}))
+
+        stats = Counter()
+        self.assertEqual(compress_output(self.root, compressed, (), stats=stats), {})
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertEqual(stats, Counter({"deleted": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import unittest
+import tempfile
+import subprocess
+
+from daemon import PageCache, iter_page_html, parse_page, send_request
+from textnodeparser import markdown_to_html_chunks, read_file
+from fixtures import MAIN, CONTENT_DIR, SiteTestCase
+
+
+class TestPageCache(unittest.TestCase):
+    def test_parsed_page_matches_chunks_eq(self):
+        paths = [os.path.join(dir_path, name) for dir_path, _, names in os.walk(CONTENT_DIR) for name in names if name.endswith(".md")]
+        self.assertTrue(paths)
+        for path in paths:
+            page = parse_page(path)
+            # The same trees serialize for every basepath
+            for basepath in (None, "/", "/site/", "/"):
+                self.assertEqual("".join(iter_page_html(page, basepath)), "".join(markdown_to_html_chunks(read_file(path), basepath)), path)
+
+    def test_parse_page_refs_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            with open(path, "w") as f:
+                f.write("# Title\n\nSee [Tom](/blog/tom)\nand ![logo](/images/logo.png)\n")
+            page = parse_page(path)
+            self.assertEqual(page.title, "Title")
+            self.assertEqual(page.refs, [("link", "/blog/tom", 3), ("image", "/images/logo.png", 4)])
+
+    def test_reparse_only_changed_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            with open(path, "w") as f:
+                f.write("# Title\n\nOld")
+            cache = PageCache()
+            page = cache.get(path)
+            self.assertIs(cache.get(path), page)
+            self.assertEqual(cache.parsed, 1)
+
+            with open(path, "w") as f:
+                f.write("# Title\n\nNew text")
+            self.assertEqual("".join(iter_page_html(cache.get(path))), "<div><h1>Title</h1><p>New text</p></div>")
+            self.assertEqual(cache.parsed, 2)
+            cache.prune([])
+            self.assertEqual(cache.pages, {})
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.socket = os.path.join(self.tmp.name, "build.sock")
+
+    def start_daemon(self):
+        daemon = subprocess.Popen([sys.executable, MAIN, "daemon", "-q", "--socket", self.socket], cwd=self.tmp.name, stdout=subprocess.DEVNULL)
+        self.addCleanup(daemon.wait)
+        self.addCleanup(daemon.kill)
+        for _ in range(100):
+            if os.path.exists(self.socket):
+                break
+            time.sleep(0.05)
+        return daemon
+
+    def test_request_drops_compressed_and_search_eq(self):
+        self.assertEqual(self.run_main("/bp/", "-q", "--sync", "--compress", "--search").returncode, 0)
+        docs = os.path.join(self.tmp.name, "docs")
+        self.assertTrue(os.path.exists(os.path.join(docs, "index.html.gz")))
+        self.assertTrue(os.path.exists(os.path.join(docs, "search", "pages.json")))
+
+        self.start_daemon()
+        response = send_request({"basepath": "/other/", "output": "./docs"}, self.socket)
+        self.assertEqual(response["errors"], {})
+        # Precompressed copies of the /bp/ pages would otherwise be served in place of the new ones
+        self.assertEqual([name for _, _, names in os.walk(docs) for name in names if name.endswith((".gz", ".br"))], [])
+        self.assertFalse(os.path.exists(os.path.join(docs, "search")))
+
+    def test_failed_page_keeps_output_eq(self):
+        self.start_daemon()
+        self.assertEqual(send_request({"basepath": "/", "output": "./docs"}, self.socket)["errors"], {})
+        source = os.path.join(self.tmp.name, "content", "contact", "index.md")
+        output = os.path.join(self.tmp.name, "docs", "contact", "index.html")
+        with open(source, "r") as f:
+            markdown = f.read()
+        with open(output, "r") as f:
+            good = f.read()
+
+        with open(source, "w") as f:
+            f.write("No title here")
+        for _ in range(2):
+            # The page stays broken, so every request reports it again and leaves its last good output
+            response = send_request({"basepath": "/", "output": "./docs"}, self.socket)
+            self.assertEqual(list(response["errors"]), ["./content/contact/index.md"])
+            self.assertEqual((response["pages"], response["stats"].get("deleted", 0)), (4, 0))
+            with open(output, "r") as f:
+                self.assertEqual(f.read(), good)
+
+        with open(source, "w") as f:
+            f.write(markdown + "\n\nMore")
+        response = send_request({"basepath": "/", "output": "./docs"}, self.socket)
+        self.assertEqual((response["errors"], response["stats"]["written"]), ({}, 1))
+
+    def test_requests_match_cli_builds_eq(self):
+        for basepath in ("/a/", "/b/"):
+            self.assertEqual(self.run_main(basepath, "-q").returncode, 0)
+            os.rename(os.path.join(self.tmp.name, "docs"), os.path.join(self.tmp.name, basepath.strip("/")))
+
+        daemon = self.start_daemon()
+        first = send_request({"basepath": "/a/", "output": "./docs"}, self.socket)
+        self.assertEqual((first["errors"], first["parsed"]), ({}, 5))
+        self.assert_same_tree(os.path.join(self.tmp.name, "docs"), os.path.join(self.tmp.name, "a"))
+
+        # A new basepath re-serializes the parsed pages without parsing anything
+        second = send_request({"basepath": "/b/", "output": "./docs"}, self.socket)
+        self.assertEqual((second["parsed"], second["stats"]["written"]), (0, 5))
+        self.assert_same_tree(os.path.join(self.tmp.name, "docs"), os.path.join(self.tmp.name, "b"))
+
+        os.remove(os.path.join(self.tmp.name, "content", "contact", "index.md"))
+        third = send_request({"basepath": "/b/", "output": "./docs"}, self.socket)
+        self.assertEqual((third["pages"], third["stats"].get("written", 0), third["stats"]["deleted"]), (4, 0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "docs", "contact")))
+
+        # The manifest stays usable for incremental CLI builds
+        self.assertNotIn("Generating page", self.run_main("/b/", "--incremental").stdout)
+        self.assertEqual(send_request({"stop": True}, self.socket), {"stopped": True})
+        self.assertEqual(daemon.wait(timeout=10), 0)
+        self.assertFalse(os.path.exists(self.socket))
+
+
+if __name__ == "__main__":
+    unittest.main()
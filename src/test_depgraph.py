@@ -0,0 +1,61 @@
+import os
+import unittest
+import tempfile
+
+from depgraph import DependencyResolver, rebuild_reasons, linked_from
+
+PAGES = ["./content/index.md", "./content/blog/tom/index.md", "./content/about.md"]
+STATIC = ["index.css", "images/tom.png"]
+
+
+class TestDependencyResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = DependencyResolver("./content", STATIC, PAGES)
+
+    def test_resolve_pages_eq(self):
+        self.assertEqual(self.resolver.resolve("/"), ("page", "./content/index.md"))
+        self.assertEqual(self.resolver.resolve("/blog/tom"), ("page", "./content/blog/tom/index.md"))
+        self.assertEqual(self.resolver.resolve("/blog/tom/index.html#top"), ("page", "./content/blog/tom/index.md"))
+        self.assertEqual(self.resolver.resolve("/about"), ("page", "./content/about.md"))
+        self.assertEqual(self.resolver.resolve("/blog/missing"), ("page", "./content/blog/missing/index.md"))
+
+    def test_resolve_assets_eq(self):
+        self.assertEqual(self.resolver.resolve("/images/tom.png"), ("asset", "images/tom.png"))
+        self.assertEqual(self.resolver.resolve("/images/missing.png?v=1"), ("asset", "images/missing.png"))
+
+    def test_resolve_external_eq(self):
+        for url in ("https://www.boot.dev", "//cdn.example.com/a.js", "#top", "mailto:me@example.com"):
+            self.assertIsNone(self.resolver.resolve(url), url)
+
+    def test_page_dependencies_eq(self):
+        refs = [("link", "/blog/tom", 1), ("image", "/images/tom.png", 3), ("link", "https://www.boot.dev", 3), ("link", "/blog/tom", 5)]
+        self.assertEqual(self.resolver.page_dependencies(refs), {"assets": ["images/tom.png"], "links": ["./content/blog/tom/index.md"]})
+
+
+class TestRebuildReasons(unittest.TestCase):
+    def test_rebuild_reasons_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "index.html")
+            entry = {"hash": "b", "dest": dest}
+            self.assertEqual(rebuild_reasons(entry, None, []), ["new page", "output missing"])
+
+            with open(dest, "w") as f:
+                f.write("<html></html>")
+            self.assertEqual(rebuild_reasons(entry, {"hash": "b", "dest": dest}, []), [])
+            self.assertEqual(rebuild_reasons(entry, {"hash": "a", "dest": dest}, ["template changed"]), ["template changed", "markdown changed"])
+            old_entry = {"hash": "b", "dest": dest, "assets": ["images/tom.png"]}
+            self.assertEqual(rebuild_reasons(entry, old_entry, [], {"images/tom.png"}), ["asset changed"])
+            self.assertEqual(rebuild_reasons(entry, old_entry, [], {"index.css"}), [])
+
+    def test_linked_from_eq(self):
+        pages = {
+            "./content/index.md": {"links": ["./content/blog/tom/index.md"]},
+            "./content/blog/tom/index.md": {"links": ["./content/index.md"]},
+            "./content/about.md": {},
+        }
+        self.assertEqual(linked_from(pages, "./content/index.md"), ["./content/blog/tom/index.md"])
+        self.assertEqual(linked_from(pages, "./content/about.md"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attribute, escape_text, set_asset_urls
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -24,6 +25,21 @@ class TestHTMLNode(unittest.TestCase):
         compare_to_value = ' href="https://www.boot.dev" target="_blank"'
         self.assertEqual(node.props_to_html(), compare_to_value)
 
+    def test_escape_eq(self):
+        self.assertEqual(escape_text("plain text"), "plain text")
+        self.assertEqual(escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d')
+        self.assertEqual(escape_text("&lt;"), "&amp;lt;")
+        self.assertEqual(escape_attribute('/a?x=1&y="2"'), "/a?x=1&amp;y=&quot;2&quot;")
+
+    def test_props_to_html_cached_eq(self):
+        node = HTMLNode(props={"href": "/blog?a&b"})
+        self.assertEqual(node.props_to_html("/site/"), ' href="/site/blog?a&amp;b"')
+        self.assertIs(node.props_to_html("/site/"), node.props_to_html("/site/"))
+        self.assertEqual(node.props_to_html("/other/"), ' href="/other/blog?a&amp;b"')
+        # Replacing props drops the cached string
+        node.props = {"href": "/tom"}
+        self.assertEqual(node.props_to_html("/site/"), ' href="/site/tom"')
+
 class TestLeafNode(unittest.TestCase):
     def test_eq(self):
         node = LeafNode("p", "Hello, World!")
@@ -55,6 +71,33 @@ class TestLeafNode(unittest.TestCase):
         compare_to_value = "boot.dev"
         self.assertEqual(node.to_html(), compare_to_value)
 
+    def test_to_html_with_basepath_eq(self):
+        node = LeafNode("a", "Home", {"href": "/blog/tom"})
+        self.assertEqual(node.to_html("/site/"), '<a href="/site/blog/tom">Home</a>')
+        node = LeafNode("img", "/images/tom.png", {"alt": "Tom"})
+        self.assertEqual(node.to_html("/site/"), '<img src="/site/images/tom.png" alt="Tom">')
+        node = LeafNode("a", "boot.dev", {"href": "https://www.boot.dev"})
+        self.assertEqual(node.to_html("/site/"), '<a href="https://www.boot.dev">boot.dev</a>')
+
+    def test_to_html_with_asset_urls_eq(self):
+        set_asset_urls({"/images/tom.png": "/images/tom.0123456789.png"})
+        try:
+            node = LeafNode("img", "/images/tom.png", {"alt": "Tom"})
+            self.assertEqual(node.to_html("/site/"), '<img src="/site/images/tom.0123456789.png" alt="Tom">')
+            node = LeafNode("a", "Tom", {"href": "/images/tom.png#full"})
+            self.assertEqual(node.to_html("/site/"), '<a href="/site/images/tom.0123456789.png#full">Tom</a>')
+            node = LeafNode("a", "Tom", {"href": "/images/tom.png/raw"})
+            self.assertEqual(node.to_html("/site/"), '<a href="/site/images/tom.png/raw">Tom</a>')
+        finally:
+            set_asset_urls({})
+
+    def test_to_html_escaped_eq(self):
+        node = LeafNode("a", "< Back & forth", {"href": "/?q=<x>", "title": 'say "hi"'})
+        self.assertEqual(node.to_html(), '<a href="/?q=&lt;x&gt;" title="say &quot;hi&quot;">&lt; Back &amp; forth</a>')
+        node = LeafNode("img", "/a.png?w=1&h=2", {"alt": "<logo>"})
+        self.assertEqual(node.to_html(), '<img src="/a.png?w=1&amp;h=2" alt="&lt;logo&gt;">')
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+
     def test_to_html_without_value_exception(self):
         node = LeafNode(None, None)
         self.assertRaises(ValueError, node.to_html)
@@ -123,6 +166,22 @@ class TestParentNode(unittest.TestCase):
         )
         self.assertNotEqual(repr(node), repr(node2))
 
+    def test_structural_eq(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", "Bold text")]), LeafNode(None, "Normal text")])
+        node2 = ParentNode("div", [ParentNode("p", [LeafNode("b", "Bold text")]), LeafNode(None, "Normal text")])
+        self.assertEqual(node, node2)
+
+    def test_structural_not_eq(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", "Bold text")]), LeafNode(None, "Normal text")])
+        node2 = ParentNode("div", [ParentNode("p", [LeafNode("b", "Bold text!")]), LeafNode(None, "Normal text")])
+        node3 = ParentNode("div", [ParentNode("p", [LeafNode("b", "Bold text")])])
+        self.assertNotEqual(node, node2)
+        self.assertNotEqual(node, node3)
+
+    def test_slots(self):
+        node = LeafNode("p", "Hello, World!")
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_to_html_eq(self):
         node = ParentNode(
             "p",
@@ -137,6 +196,24 @@ class TestParentNode(unittest.TestCase):
         compare_to_value = '<p class="text"><b>Bold text</b>Normal text<i>italic text</i>Normal text</p>'
         self.assertEqual(node.to_html(), compare_to_value)
 
+    def test_iter_html_eq(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold text"), LeafNode(None, "Normal text")]),
+                LeafNode("i", "italic text"),
+            ],
+        )
+        compare_to_value = ["<div>", "<p>", "<b>Bold text</b>", "Normal text", "</p>", "<i>italic text</i>", "</div>"]
+        self.assertEqual(list(node.iter_html()), compare_to_value)
+        self.assertEqual(node.to_html(), "".join(compare_to_value))
+
+    def test_write_html_eq(self):
+        node = ParentNode("p", [LeafNode("b", "Bold text"), LeafNode(None, "Normal text")])
+        fp = io.StringIO()
+        node.write_html(fp)
+        self.assertEqual(fp.getvalue(), "<p><b>Bold text</b>Normal text</p>")
+
     def test_to_html_without_tag_exception(self):
         node = ParentNode(None, [LeafNode(None, None)])
         self.assertRaises(ValueError, node.to_html)
@@ -0,0 +1,76 @@
+import os
+import random
+import unittest
+
+from textnodeparser import *
+from textnode import *
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content")
+
+# Inputs from TestTextToTextNodes plus the edge cases the pass ordering decides
+TEXT_CASES = [
+    "",
+    "This is text with no markdown",
+    "This is text with **bold** markdown",
+    "This is text with *italic* markdown",
+    "This is text with `code` markdown",
+    "This is text with a [link](https://www.boot.dev)",
+    "This is text with an ![image](https://www.boot.dev)",
+    "This is **text** with an *italic* word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+    "***bold then italic***",
+    "**bold with *stars* and `code` inside**",
+    "`code with **stars** inside`",
+    "empty ****bold** and ``code",
+    "a [link with ![image](/a.png) text](/b)",
+    "![image](/a.png)[link](/b)",
+    "[link](https://example.com/a_b_c)",
+    "a **link [inside](/bold)** stays bold",
+]
+
+ERROR_CASES = [
+    "unclosed **bold",
+    "unclosed *italic",
+    "*italic cut by **bold*",
+    "`code cut by *italic`",
+    "_italic cut by *stars_",
+]
+
+
+def run(func, text):
+    try:
+        return repr(func(text))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+class TestTokenizeInline(unittest.TestCase):
+    def assertMatchesMultipass(self, text):
+        self.assertEqual(run(text_to_textnodes_multipass, text), run(tokenize_inline, text), text)
+
+    def test_text_cases_eq(self):
+        for text in TEXT_CASES:
+            self.assertMatchesMultipass(text)
+
+    def test_error_cases_eq(self):
+        for text in ERROR_CASES:
+            self.assertRaises(Exception, tokenize_inline, text)
+            self.assertMatchesMultipass(text)
+
+    def test_content_corpus_eq(self):
+        for root, _, files in os.walk(CONTENT_DIR):
+            for name in files:
+                if name.endswith(".md"):
+                    with open(os.path.join(root, name), "r") as f:
+                        for block in markdown_to_blocks(f.read()):
+                            self.assertMatchesMultipass(block)
+
+    def test_random_inputs_eq(self):
+        rng = random.Random(1)
+        alphabet = list("ab *_`![]()") + ["**", "![a](/b)", "[c](/d)"]
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            self.assertMatchesMultipass(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
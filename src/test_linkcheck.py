@@ -0,0 +1,31 @@
+import unittest
+
+from linkcheck import check_links
+from textnodeparser import blocks_to_html_chunks, iter_blocks
+
+
+class TestCheckLinks(unittest.TestCase):
+    def test_check_links_eq(self):
+        pages = {
+            "./content/index.md": {"refs": [["link", "/blog/tom", 3], ["link", "/blog/nope", 5], ["image", "/images/tom.png", 7], ["link", "https://www.boot.dev", 9]]},
+            "./content/blog/tom/index.md": {"refs": [["link", "/", 1], ["image", "/images/none.png", 2]]},
+        }
+        actual = check_links(pages, ["images/tom.png"], "./content")
+        expected = [
+            ("./content/blog/tom/index.md", 2, "image", "/images/none.png"),
+            ("./content/index.md", 5, "link", "/blog/nope"),
+        ]
+        self.assertEqual(expected, actual)
+
+
+class TestRefLines(unittest.TestCase):
+    def test_ref_lines_eq(self):
+        markdown = "# Title\n\nA [first](/a) link\nand a [second](/b) link\n\n- ![image](/c.png)\n- [first](/a)"
+        refs = []
+        "".join(blocks_to_html_chunks(iter_blocks(markdown.split("\n")), refs=refs))
+        expected = [("link", "/a", 3), ("link", "/b", 4), ("image", "/c.png", 6), ("link", "/a", 7)]
+        self.assertEqual(expected, refs)
+
+
+if __name__ == "__main__":
+    unittest.main()
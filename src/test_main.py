@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase
+
+
+class TestBuild(SiteTestCase):
+    def test_failed_page_keeps_output_eq(self):
+        self.assertEqual(self.run_main("/", "-q").returncode, 0)
+        with open(os.path.join(self.tmp.name, "content", "contact", "index.md"), "w") as f:
+            f.write("No title here")
+
+        for args in (["--incremental"], ["--incremental", "--atomic"]):
+            build = self.run_main("/", *args)
+            self.assertEqual(build.returncode, 1)
+            self.assertNotIn("Removing", build.stdout)
+            self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "docs", "contact", "index.html")))
+
+        # The page is still retried once its source is fixed
+        with open(os.path.join(self.tmp.name, "content", "contact", "index.md"), "w") as f:
+            f.write("# Contact\n\nFixed")
+        build = self.run_main("/", "--incremental")
+        self.assertEqual(build.returncode, 0)
+        with open(os.path.join(self.tmp.name, "docs", "contact", "index.html")) as f:
+            self.assertIn("Fixed", f.read())
+
+
+    def test_parallel_build_matches_serial_eq(self):
+        for jobs in ("1", "4"):
+            self.assertEqual(self.run_main("/site/", "-q", "-j", jobs).returncode, 0)
+            os.rename(os.path.join(self.tmp.name, "docs"), os.path.join(self.tmp.name, f"docs-{jobs}"))
+        self.assert_same_tree(os.path.join(self.tmp.name, "docs-1"), os.path.join(self.tmp.name, "docs-4"))
+
+        # A bad page is reported on its own line and fails the build, whichever process rendered it
+        with open(os.path.join(self.tmp.name, "content", "blog", "tom", "index.md"), "w") as f:
+            f.write("No title here")
+        for jobs in ("1", "4"):
+            build = self.run_main("/site/", "-q", "-j", jobs)
+            self.assertEqual(build.returncode, 1)
+            self.assertEqual(build.stderr.splitlines(), ["Error generating ./content/blog/tom/index.md: Exception: No title found"])
+            self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "docs", "blog", "majesty", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import unittest
+import tempfile
+
+from manifest import hash_bytes, hash_file, load_manifest, save_manifest
+from fixtures import SiteTestCase
+
+
+class TestManifest(unittest.TestCase):
+    def test_hash_file_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "wb") as f:
+                f.write(b"# Title")
+            self.assertEqual(hash_file(path), hash_bytes(b"# Title"))
+
+    def test_save_and_load_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "manifest.json")
+            manifest = {"template": "abc", "basepath": "/", "pages": {"./content/index.md": {"hash": "def", "dest": "./docs/index.html"}}}
+            save_manifest(manifest, path)
+            self.assertEqual(load_manifest(path), manifest)
+
+    def test_load_missing_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(load_manifest(os.path.join(tmp, "manifest.json")), {})
+
+    def test_load_corrupt_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            with open(path, "w") as f:
+                f.write("{not json")
+            self.assertEqual(load_manifest(path), {})
+
+
+class TestIncrementalBuild(SiteTestCase):
+    PAGES = ["./content/blog/glorfindel/index.md", "./content/blog/majesty/index.md", "./content/blog/tom/index.md", "./content/contact/index.md", "./content/index.md"]
+
+    def build(self, basepath="/"):
+        result = self.run_main(basepath, "--incremental")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        lines = result.stdout.splitlines()
+        generated = sorted(line.split()[3] for line in lines if line.startswith("Generating page"))
+        return generated, [line for line in lines if line.startswith("Removing")]
+
+    def append(self, name, text):
+        with open(os.path.join(self.tmp.name, name), "a") as f:
+            f.write(text)
+
+    def test_rebuilds_only_changed_pages_eq(self):
+        self.assertEqual(self.build(), (self.PAGES, []))
+        self.assertEqual(self.build(), ([], []))
+
+        self.append("content/blog/tom/index.md", "\n\nOne more line")
+        self.assertEqual(self.build(), (["./content/blog/tom/index.md"], []))
+
+        # The template and the basepath are part of every page
+        self.append("template.html", "<!-- changed -->")
+        self.assertEqual(self.build(), (self.PAGES, []))
+        self.assertEqual(self.build("/site/"), (self.PAGES, []))
+        self.assertEqual(self.build("/site/"), ([], []))
+
+    def test_removed_source_deletes_its_output_eq(self):
+        self.build()
+        docs = os.path.join(self.tmp.name, "docs")
+        before = sorted(os.path.join(dir_path, name) for dir_path, _, names in os.walk(docs) for name in names)
+        os.remove(os.path.join(self.tmp.name, "content", "contact", "index.md"))
+
+        self.assertEqual(self.build(), ([], ["Removing ./docs/contact/index.html"]))
+        after = sorted(os.path.join(dir_path, name) for dir_path, _, names in os.walk(docs) for name in names)
+        self.assertEqual(after, [path for path in before if path != os.path.join(docs, "contact", "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(docs, "contact")))
+
+
+if __name__ == "__main__":
+    unittest.main()
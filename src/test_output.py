@@ -0,0 +1,100 @@
+import os
+import unittest
+
+from output import FileWriter, OutputWriter, ReplacementFile, begin_staging, make_dirs, publish, relocate
+from fixtures import write, read, TempDirTestCase
+
+
+class TestOutput(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        write(os.path.join(self.dest, "index.html"), "old index")
+        write(os.path.join(self.dest, "blog", "tom.html"), "old tom")
+
+    def test_replacement_keeps_hardlinks_eq(self):
+        path = os.path.join(self.dest, "index.html")
+        link = os.path.join(self.tmp.name, "link.html")
+        os.link(path, link)
+        with ReplacementFile(path) as f:
+            f.write("new index")
+        self.assertEqual(read(path), "new index")
+        self.assertEqual(read(link), "old index")
+
+    def test_replacement_error_keeps_old_eq(self):
+        path = os.path.join(self.dest, "index.html")
+        with self.assertRaises(ValueError):
+            with ReplacementFile(path) as f:
+                f.write("half")
+                raise ValueError("render failed")
+        self.assertEqual(read(path), "old index")
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_replacement_skips_unchanged_eq(self):
+        path = os.path.join(self.dest, "index.html")
+        os.utime(path, ns=(0, 0))
+        same = ReplacementFile(path)
+        with same as f:
+            f.write("old index")
+        self.assertFalse(same.changed)
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+        # Same size, different contents
+        different = ReplacementFile(path)
+        with different as f:
+            f.write("new index")
+        self.assertTrue(different.changed)
+        self.assertEqual(read(path), "new index")
+
+    def test_file_writer_unchanged_eq(self):
+        writer = FileWriter()
+        writer.write(os.path.join(self.dest, "index.html"), iter(["old ", "index"]))
+        writer.write(os.path.join(self.dest, "blog", "tom.html"), iter(["new tom"]))
+        writer.write(os.path.join(self.dest, "new", "page.html"), iter(["new page"]))
+        self.assertEqual(writer.unchanged, {os.path.join(self.dest, "index.html")})
+        self.assertEqual(read(os.path.join(self.dest, "new", "page.html")), "new page")
+
+    def test_make_dirs_eq(self):
+        paths = [os.path.join(self.tmp.name, "a", "b", "x.html"), os.path.join(self.tmp.name, "a", "b", "y.html")]
+        self.assertEqual(make_dirs(paths), {os.path.join(self.tmp.name, "a", "b")})
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp.name, "a", "b")))
+
+    def test_relocate_eq(self):
+        self.assertEqual(relocate("./docs/blog/tom.html", "./docs", "docs.staging"), os.path.join("docs.staging", "blog", "tom.html"))
+
+    def test_staged_build_published_eq(self):
+        staging = begin_staging(self.dest)
+        self.assertEqual(read(os.path.join(staging, "blog", "tom.html")), "old tom")
+        with ReplacementFile(os.path.join(staging, "index.html")) as f:
+            f.write("new index")
+
+        # The live tree is untouched until the staging tree is published
+        self.assertEqual(read(os.path.join(self.dest, "index.html")), "old index")
+        publish(staging, self.dest)
+        self.assertEqual(read(os.path.join(self.dest, "index.html")), "new index")
+        self.assertEqual(read(os.path.join(self.dest, "blog", "tom.html")), "old tom")
+        self.assertFalse(os.path.exists(staging))
+        self.assertEqual(os.listdir(self.tmp.name), ["docs"])
+
+    def test_begin_staging_discards_leftovers_eq(self):
+        write(os.path.join(self.dest + ".staging", "partial.html"), "partial")
+        staging = begin_staging(self.dest, clone=False)
+        self.assertEqual(os.listdir(staging), [])
+
+    def test_writer_eq(self):
+        writer = OutputWriter()
+        writer.write(os.path.join(self.dest, "new", "page.html"), ["<p>", "new", "</p>"])
+        writer.write(os.path.join(self.dest, "index.html"), ["new index"])
+        writer.write(os.path.join(self.dest, "blog", "tom.html"), ["old tom"])
+        blocked = os.path.join(self.dest, "index.html", "page.html")
+        writer.write(blocked, ["unreachable"])
+        errors = writer.close()
+        self.assertEqual(read(os.path.join(self.dest, "new", "page.html")), "<p>new</p>")
+        self.assertEqual(read(os.path.join(self.dest, "index.html")), "new index")
+        self.assertEqual(list(errors), [blocked])
+        self.assertEqual(writer.unchanged, {os.path.join(self.dest, "blog", "tom.html")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from profiler import PAGE_PHASES, NULL_PROFILER, PageProfiler, build_report
+from textnodeparser import markdown_to_htmlnode, markdown_to_html_chunks, markdown_to_html_profiled
+
+
+class TestPageProfiler(unittest.TestCase):
+    def test_measure_returns_result_eq(self):
+        profiler = PageProfiler()
+        self.assertEqual(profiler.measure("read", lambda a, b: a + b, 1, 2), 3)
+        self.assertEqual(NULL_PROFILER.measure("read", lambda a, b: a + b, 1, 2), 3)
+        self.assertFalse(NULL_PROFILER)
+
+    def test_measure_allocated_bytes_eq(self):
+        profiler = PageProfiler()
+        # Memory a phase allocates counts even when it is freed before the phase ends
+        profiler.measure("read", lambda: len(bytearray(1024 * 1024)))
+        profiler.measure("write", lambda: None)
+        phases = profiler.to_dict()["phases"]
+        self.assertGreaterEqual(phases["read"]["allocated_bytes"], 1024 * 1024)
+        self.assertLess(phases["write"]["allocated_bytes"], 1024)
+
+    def test_markdown_phases_eq(self):
+        profiler = PageProfiler()
+        markdown = "# Title\n\nSome **bold** text\n\n- one\n- two"
+        self.assertEqual(markdown_to_htmlnode(markdown, profiler), markdown_to_htmlnode(markdown))
+        page = profiler.to_dict()
+        self.assertEqual(list(page["phases"]), PAGE_PHASES)
+        self.assertGreater(page["phases"]["inline"]["seconds"], 0)
+        self.assertEqual(page["phases"]["write"]["seconds"], 0)
+
+    def test_direct_renderer_phases_eq(self):
+        profiler = PageProfiler()
+        markdown = "# Title\n\nSome **bold** [link](/a)\n\n- one\n- two"
+        refs = []
+        self.assertEqual(markdown_to_html_profiled(markdown, "/site/", profiler, refs), "".join(markdown_to_html_chunks(markdown, "/site/")))
+        self.assertEqual(refs, [("link", "/a")])
+        phases = profiler.to_dict()["phases"]
+        self.assertGreater(phases["block_to_html"]["seconds"], 0)
+        self.assertEqual((phases["inline"]["seconds"], phases["to_html"]["seconds"]), (0, 0))
+
+    def test_build_report_eq(self):
+        pages = {}
+        for name, seconds, allocated in (("a.md", 1.0, 3), ("b.md", 2.0, 5)):
+            profiler = PageProfiler()
+            profiler.phases["read"] = [seconds, allocated]
+            pages[name] = profiler.to_dict()
+        report = build_report(pages, 0.5)
+        self.assertEqual(report["static"], {"seconds": 0.5})
+        self.assertEqual(report["phases"]["read"], {"seconds": 3.0, "allocated_bytes": 8})
+        self.assertEqual(report["pages"]["b.md"]["total"], 2.0)
+        self.assertNotIn("search", report)
+        self.assertEqual(build_report(pages, 0.5, {"seconds": 0.1, "bytes": 10})["search"], {"seconds": 0.1, "bytes": 10})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import json
+import unittest
+import tempfile
+from collections import Counter
+
+from terms import count_terms
+from textnodeparser import generate_page
+from search import index_page, term_shard, page_url, update_search_index, remove_search_index
+from fixtures import write, TempDirTestCase
+
+
+def read_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+MARKDOWN = "# Tom Bombadil\n\nOld Tom is [a merry fellow](/blog/tom).\n\n![Goldberry by the river](/images/goldberry.png)\n\n```\nhey dol\n```"
+
+class TestPageTerms(unittest.TestCase):
+    def test_count_terms_eq(self):
+        terms = Counter()
+        count_terms('<p>Tom &amp; <a href="/blog/tom">Bombadil</a> <img src="/images/goldberry.png" alt="Goldberry &lt;3"></p>', terms)
+        self.assertEqual(terms, Counter({"tom": 1, "bombadil": 1, "goldberry": 1}))
+
+    def test_index_page_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            write(path, MARKDOWN)
+            index = index_page(path)
+        self.assertEqual(index["title"], "Tom Bombadil")
+        terms = index["terms"]
+        self.assertEqual(terms["tom"], 2)
+        for term in ("bombadil", "merry", "goldberry", "river", "hey", "dol"):
+            self.assertIn(term, terms)
+        # URLs and single characters aren't words
+        self.assertNotIn("images", terms)
+        self.assertNotIn("a", terms)
+
+    def test_generate_page_index_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            from_path = os.path.join(tmp, "index.md")
+            template_path = os.path.join(tmp, "template.html")
+            write(from_path, MARKDOWN)
+            write(template_path, "<title>{{ Title }}</title>{{ Content }}")
+            index = {}
+            generate_page(from_path, template_path, os.path.join(tmp, "index.html"), "/", index=index)
+            # The page's words are collected while it renders, the same ones index_page finds
+            self.assertEqual(index, index_page(from_path))
+
+    def test_term_shard_eq(self):
+        self.assertEqual(term_shard("tom"), "t")
+        self.assertEqual(term_shard("3rd"), "3")
+        self.assertEqual(term_shard("éowyn"), "_")
+
+    def test_page_url_eq(self):
+        self.assertEqual(page_url("./docs/blog/tom/index.html", "./docs", "/site/"), "/site/blog/tom/")
+        self.assertEqual(page_url("./docs/index.html", "./docs", "/"), "/")
+        self.assertEqual(page_url("./docs/about.html", "./docs", "/"), "/about.html")
+
+
+class TestSearchIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.pages = {}
+        self.add_page("index.md", "# Home\n\nTom and Goldberry")
+        self.add_page("about.md", "# About\n\nBree")
+
+    def add_page(self, name, markdown):
+        from_path = os.path.join(self.content, name)
+        write(from_path, markdown)
+        self.pages[from_path] = {"hash": markdown, "dest": os.path.join(self.docs, name[:-3] + ".html")}
+
+    def test_index_eq(self):
+        cache, summary = update_search_index(self.pages, self.docs, self.docs, "/", {})
+        self.assertEqual(read_json(os.path.join(self.docs, "search", "pages.json")), {"0": ["/about.html", "About"], "1": ["/", "Home"]})
+        self.assertEqual(read_json(os.path.join(self.docs, "search", "terms-t.json")), {"tom": [[1, 1]]})
+        self.assertEqual((summary["pages"], summary["terms"], summary["shards_written"]), (2, 6, summary["shards"]))
+
+        # Only the shards of terms that changed are written again, and ids stay put
+        for shard in ("a", "b", "g", "h", "t"):
+            os.utime(os.path.join(self.docs, "search", f"terms-{shard}.json"), ns=(1, 1))
+        self.add_page("index.md", "# Home\n\nTom and Bombadil")
+        cache, summary = update_search_index(self.pages, self.docs, self.docs, "/", cache)
+        self.assertEqual(summary["shards_written"], 1)
+        self.assertEqual(read_json(os.path.join(self.docs, "search", "terms-b.json")), {"bombadil": [[1, 1]], "bree": [[0, 1]]})
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "terms-g.json")))
+        self.assertEqual(os.stat(os.path.join(self.docs, "search", "terms-t.json")).st_mtime_ns, 1)
+
+        del self.pages[os.path.join(self.content, "about.md")]
+        cache, summary = update_search_index(self.pages, self.docs, self.docs, "/", cache)
+        self.assertEqual(read_json(os.path.join(self.docs, "search", "pages.json")), {"1": ["/", "Home"]})
+        self.assertEqual(read_json(os.path.join(self.docs, "search", "terms-b.json")), {"bombadil": [[1, 1]]})
+
+        # Terms collected while rendering are used as given; the page isn't read again
+        self.add_page("index.md", "# Home\n\nTom")
+        cache, summary = update_search_index(self.pages, self.docs, self.docs, "/", cache, page_index={os.path.join(self.content, "index.md"): {"title": "Home", "terms": {"goldberry": 2}}})
+        self.assertEqual(read_json(os.path.join(self.docs, "search", "terms-g.json")), {"goldberry": [[1, 2]]})
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "terms-t.json")))
+
+        self.assertEqual(remove_search_index(self.docs, cache), {})
+        self.assertEqual(os.listdir(self.docs), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
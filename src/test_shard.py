@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+import subprocess
+
+from shard import parse_shard, shard_of, shard_pages, check_shard_manifests, merge_manifests
+from fixtures import MAIN, SiteTestCase
+
+
+class TestShard(unittest.TestCase):
+    def test_parse_shard_eq(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "1/0", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shard_pages_partition_eq(self):
+        pages = [(f"./content/blog/post{i}.md", f"./docs/blog/post{i}.html") for i in range(200)]
+        shards = [shard_pages(pages, (k, 4)) for k in range(1, 5)]
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(pages))
+        self.assertTrue(all(shards))
+        # The same path lands in the same shard whatever else is in the list
+        self.assertEqual(shard_of("./content/blog/post7.md", 4), shard_of("content/blog/post7.md", 4))
+        self.assertEqual(shard_pages(pages[7:8], (shard_of(pages[7][0], 4), 4)), pages[7:8])
+        self.assertIs(shard_pages(pages, None), pages)
+
+    def test_check_shard_manifests_eq(self):
+        manifests = [{"shard": [k, 2], "template": "t", "basepath": "/"} for k in (1, 2)]
+        self.assertIsNone(check_shard_manifests(manifests))
+        self.assertIn("missing 2", check_shard_manifests(manifests[:1]))
+        self.assertIn("basepath", check_shard_manifests([manifests[0], dict(manifests[1], basepath="/site/")]))
+        self.assertIn("--shard", check_shard_manifests([manifests[0], {}]))
+
+    def test_merge_manifests_eq(self):
+        manifests = [
+            {"shard": [2, 2], "template": "t", "basepath": "/", "static": [], "pages": {"./content/b.md": {}}},
+            {"shard": [1, 2], "template": "t", "basepath": "/", "static": ["index.css"], "pages": {"./content/a.md": {}}},
+        ]
+        merged = merge_manifests(manifests)
+        self.assertEqual(merged["static"], ["index.css"])
+        self.assertEqual(sorted(merged["pages"]), ["./content/a.md", "./content/b.md"])
+        self.assertNotIn("shard", merged)
+
+
+class TestShardedBuild(SiteTestCase):
+    def test_merged_shards_match_single_build_eq(self):
+        self.assertEqual(self.run_main("/site/", "-q").returncode, 0)
+        os.rename(os.path.join(self.tmp.name, "docs"), os.path.join(self.tmp.name, "single"))
+
+        shards = [subprocess.Popen([sys.executable, MAIN, "/site/", "-q", "--shard", f"{k}/3"], cwd=self.tmp.name, stdout=subprocess.DEVNULL) for k in (1, 2, 3)]
+        self.assertEqual([shard.wait() for shard in shards], [0, 0, 0])
+        # Only the first shard copies ./static
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "docs.shard-2-of-3", "index.css")))
+
+        merge = self.run_main("merge", "docs.shard-1-of-3", "docs.shard-2-of-3", "docs.shard-3-of-3", "-q", "--check-links")
+        self.assertEqual(merge.returncode, 0, merge.stderr)
+        self.assert_same_tree(os.path.join(self.tmp.name, "docs"), os.path.join(self.tmp.name, "single"))
+
+        self.assertEqual(self.run_main("merge", "docs.shard-1-of-3", "docs.shard-2-of-3").returncode, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import unittest
+from collections import Counter
+
+from sync import list_files, sync_files
+from fixtures import write, TempDirTestCase
+
+
+class TestSyncFiles(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        write(os.path.join(self.src, "index.css"), "body {}")
+        write(os.path.join(self.src, "images", "tom.png"), "png")
+        write(os.path.join(self.dest, "index.html"), "<html></html>")
+
+    def test_list_files_eq(self):
+        self.assertEqual(list_files(self.src), [os.path.join("images", "tom.png"), "index.css"])
+
+    def test_sync_copies_once_eq(self):
+        sync_files(self.src, self.dest)
+        dest_path = os.path.join(self.dest, "index.css")
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "body {}")
+
+        os.utime(dest_path, ns=(1, 1))
+        os.utime(os.path.join(self.src, "index.css"), ns=(1, 1))
+        os.chmod(dest_path, 0o444)
+        # An unchanged file must be left alone, so a read-only copy is never reopened
+        sync_files(self.src, self.dest)
+        self.assertEqual(os.stat(dest_path).st_mtime_ns, 1)
+
+    def test_sync_hash_skips_same_content_eq(self):
+        sync_files(self.src, self.dest)
+        dest_path = os.path.join(self.dest, "index.css")
+        os.utime(dest_path, ns=(1, 1))
+        sync_files(self.src, self.dest, use_hash=True)
+        self.assertEqual(os.stat(dest_path).st_mtime_ns, 1)
+
+    def test_sync_removes_orphans_only_eq(self):
+        previous = sync_files(self.src, self.dest)
+        os.remove(os.path.join(self.src, "images", "tom.png"))
+        stats = Counter()
+        current = sync_files(self.src, self.dest, previous, stats=stats)
+
+        self.assertEqual(current, ["index.css"])
+        self.assertEqual(stats, {"unchanged": 1, "deleted": 1})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_sync_link_eq(self):
+        sync_files(self.src, self.dest, link=True)
+        self.assertTrue(os.path.samefile(os.path.join(self.src, "index.css"), os.path.join(self.dest, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
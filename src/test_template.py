@@ -0,0 +1,49 @@
+import os
+import unittest
+import tempfile
+
+from template import compile_template, load_template, template_urls
+
+
+class TestCompileTemplate(unittest.TestCase):
+    def test_segments_eq(self):
+        template = compile_template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.segments, ["<title>", "Title", "</title><main>", "Content", "</main>"])
+
+    def test_render_eq(self):
+        template = compile_template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        actual = template.render({"Title": "Home", "Content": iter(["<p>", "Hi", "</p>"])})
+        self.assertEqual(actual, "<title>Home</title><main><p>Hi</p></main>")
+
+    def test_render_unknown_slot_eq(self):
+        template = compile_template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home {{ Footer }}")
+
+    def test_basepath_eq(self):
+        template = compile_template('<link href="/index.css"><img src="/a.png"><a href="https://boot.dev">{{ Content }}</a>', "/site/")
+        actual = template.render({"Content": '<a href="/untouched">'})
+        self.assertEqual(actual, '<link href="/site/index.css"><img src="/site/a.png"><a href="https://boot.dev"><a href="/untouched"></a>')
+
+    def test_template_urls_eq(self):
+        source = '<link href="/index.css"><a href="{{ Link }}">{{ Content }}</a><img src="https://boot.dev/a.png">'
+        self.assertEqual(template_urls(source), {"/index.css", "https://boot.dev/a.png"})
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def test_reload_on_change_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(1, 1))
+            template = load_template(path)
+            self.assertIs(load_template(path), template)
+
+            with open(path, "w") as f:
+                f.write("<h2>{{ Title }}</h2>")
+            os.utime(path, ns=(2, 2))
+            self.assertEqual(load_template(path).render({"Title": "Home"}), "<h2>Home</h2>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
+import io
+import os
 import unittest
+import tempfile
 
 from textnodeparser import *
 from textnode import *
@@ -301,6 +304,79 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
         ]
         self.assertEqual(f"{expected_blocks}", f"{actual_blocks}")
 
+class TestIterBlocks(unittest.TestCase):
+    def test_iter_blocks_eq(self):
+        lines = io.StringIO("# Heading\n\nSome *text*\n\n\n- one\n- two\n")
+        actual_blocks = list(iter_blocks(lines))
+        expected_blocks = [
+            ("heading", "# Heading", 1),
+            ("paragraph", "Some *text*", 3),
+            ("unordered_list", "- one\n- two", 6),
+        ]
+        self.assertEqual(expected_blocks, actual_blocks)
+
+    def test_iter_blocks_fenced_code_with_blank_lines_eq(self):
+        lines = io.StringIO("```python\ndef a():\n    pass\n\n\ndef b():\n    pass\n```\n\n```inline```\n\nAfter")
+        actual_blocks = list(iter_blocks(lines))
+        expected_blocks = [
+            ("code", "```python\ndef a():\n    pass\n\n\ndef b():\n    pass\n```", 1),
+            ("code", "```inline```", 10),
+            ("paragraph", "After", 12),
+        ]
+        self.assertEqual(expected_blocks, actual_blocks)
+
+class TestMarkdownSource(unittest.TestCase):
+    def write_source(self, data):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "page.md")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def assert_same_as_lines(self, path):
+        with open(path, "r") as f:
+            first_line = f.readline()
+            f.seek(0)
+            expected_blocks = list(iter_blocks(f))
+        with MarkdownSource(path) as src:
+            self.assertEqual(src.first_line(), first_line)
+            self.assertEqual(list(src.iter_blocks()), expected_blocks)
+
+    def test_content_corpus_eq(self):
+        paths = [os.path.join(dir_path, name) for dir_path, _, names in os.walk(CONTENT_DIR) for name in names if name.endswith(".md")]
+        self.assertTrue(paths)
+        for path in paths:
+            self.assert_same_as_lines(path)
+
+    def test_edge_cases_eq(self):
+        sources = [
+            b"",
+            b"# Title",
+            b"\n\n# Title\n\n\n",
+            b"# Title\n   \n\t\nText\n",
+            b"  \n```python\ndef a():\n\n    pass\n  ```  \n\nAfter\n",
+            b"```\nnever closed\n\nstill code",
+            b"```inline```\n\n````\n```x\n\n````\nTail",
+            "# Caf\u00e9\n\n\u00a0\n\n\u00a0text \u2014 more\n".encode(),
+        ]
+        for data in sources:
+            self.assert_same_as_lines(self.write_source(data))
+
+    def test_crlf_uses_line_reader_eq(self):
+        path = self.write_source(b"# Title\r\n\r\nSome *text*\r\n")
+        with MarkdownSource(path) as src:
+            self.assertEqual(src.first_line(), "# Title\n")
+            self.assertEqual(list(src.iter_blocks()), [("heading", "# Title", 1), ("paragraph", "Some *text*", 3)])
+
+    def test_closes_mid_page_eq(self):
+        path = self.write_source(b"# Title\n\nOne\n\nTwo\n")
+        with self.assertRaises(KeyError):
+            with MarkdownSource(path) as src:
+                next(src.iter_blocks())
+                raise KeyError("render failed")
+        self.assertTrue(src.file.closed)
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_block_type_heading_eq(self):
         block = "# This is a heading"
@@ -346,6 +422,19 @@ print("Hello, World!")
         expected_block_type = "ordered_list"
         self.assertEqual(expected_block_type, actual_block_type)
 
+    def test_block_to_block_type_near_misses_eq(self):
+        blocks = [
+            "# heading\nwith a second line",
+            "####### too deep",
+            "```not closed",
+            "> quote\nnot a quote",
+            "* item\nnot an item",
+            "1. first\n3. third",
+            "2. starts at two",
+        ]
+        for block in blocks:
+            self.assertEqual("paragraph", block_to_block_type(block), block)
+
     def test_block_to_block_type_paragraph_eq(self):
         block = "This is a paragraph of text. Blah blah blah."
         actual_block_type = block_to_block_type(block)
@@ -406,5 +495,65 @@ class TestExtractTitle(unittest.TestCase):
         text = """This is a paragraph of text."""
         self.assertRaises(Exception, extract_title, text)
 
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content")
+
+class TestDirectRenderer(unittest.TestCase):
+    def outcome(self, render, block_type, block, basepath):
+        refs = []
+        try:
+            return render(block_type, block, basepath, refs), refs
+        except Exception as e:
+            return type(e), str(e)
+
+    def assert_same_as_tree(self, markdown, basepath=None):
+        for block_type, block, _ in iter_blocks(markdown.split("\n")):
+            self.assertEqual(self.outcome(block_to_html, block_type, block, basepath), self.outcome(block_to_html_tree, block_type, block, basepath), block)
+
+    def test_content_corpus_eq(self):
+        paths = [os.path.join(dir_path, name) for dir_path, _, names in os.walk(CONTENT_DIR) for name in names if name.endswith(".md")]
+        self.assertTrue(paths)
+        for path in paths:
+            markdown = read_file(path)
+            for basepath in (None, "/", "/site/"):
+                self.assert_same_as_tree(markdown, basepath)
+                expected = markdown_to_htmlnode(markdown).to_html(basepath)
+                set_renderer("direct")
+                self.assertEqual("".join(markdown_to_html_chunks(markdown, basepath)), expected, path)
+
+    def test_edge_cases_eq(self):
+        markdown = "\n\n".join([
+            "# **bold** _it_ `code` [link](/a) ![alt](/b.png)",
+            "###### ****",
+            "- item\n- \n- other",
+            "1. one\n2.",
+            "> quoted *text*\n> more",
+            "```\n```",
+            "``````",
+            "[](/empty) *unclosed",
+            "a *b **c** d* e",
+            "![](/x.png) ![alt]()",
+        ])
+        self.assert_same_as_tree(markdown, "/site/")
+
+    def test_escaping_eq(self):
+        markdown = '[< Back](/a?x=1&y="2") **a < b & c** `<br>` ![say "hi"](/q.png?a&b)\n\n```\n<script>\n```'
+        self.assert_same_as_tree(markdown, "/site/")
+        self.assertEqual(
+            "".join(markdown_to_html_chunks(markdown, "/site/")),
+            '<div><p><a href="/site/a?x=1&amp;y=&quot;2&quot;">&lt; Back</a> <b>a &lt; b &amp; c</b> <code>&lt;br&gt;</code> '
+            '<img src="/site/q.png?a&amp;b" alt="say &quot;hi&quot;"></p><pre><code>\n&lt;script&gt;\n</code></pre></div>',
+        )
+
+    def test_tree_renderer_eq(self):
+        markdown = "# Title\n\nSome [link](/a)"
+        set_renderer("tree")
+        try:
+            tree = "".join(markdown_to_html_chunks(markdown, "/site/"))
+        finally:
+            set_renderer("direct")
+        self.assertEqual(tree, "".join(markdown_to_html_chunks(markdown, "/site/")))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+import unittest
+import tempfile
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from watch import snapshot, diff_snapshots, serve
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_diff_snapshots_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "blog"))
+            paths = [os.path.join(tmp, name) for name in ("index.md", "blog/tom.md", "blog/old.md")]
+            for path in paths:
+                with open(path, "w") as f:
+                    f.write("# Title")
+            before = snapshot([tmp])
+
+            with open(paths[1], "a") as f:
+                f.write("\n\nMore")
+            os.remove(paths[2])
+            after = snapshot([tmp])
+
+            self.assertEqual(diff_snapshots(before, after), ([paths[1]], [paths[2]]))
+            self.assertEqual(diff_snapshots(after, after), ([], []))
+
+    def test_snapshot_single_file_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Content }}")
+            self.assertEqual(list(snapshot([path, os.path.join(tmp, "missing.html")])), [path])
+
+
+class TestServe(unittest.TestCase):
+    def test_serves_under_basepath_eq(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "blog"))
+            for name in ("index.html", "blog/index.html"):
+                with open(os.path.join(tmp, name), "w") as f:
+                    f.write(name)
+            server = serve(tmp, 0, "/site/")
+            try:
+                root = f"http://localhost:{server.server_address[1]}"
+                # Pages link to /site/..., so that's where the site is found
+                for url, body in (("/site/", "index.html"), ("/site/blog/", "blog/index.html"), ("/site/blog", "blog/index.html")):
+                    with urlopen(root + url) as response:
+                        self.assertEqual(response.read().decode(), body)
+                for url in ("/", "/blog/", "/other/index.html"):
+                    with self.assertRaises(HTTPError) as error:
+                        urlopen(root + url)
+                    self.assertEqual(error.exception.code, 404)
+                    error.exception.close()
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
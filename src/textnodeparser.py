@@ -1,8 +1,23 @@
 import re
 import os
+import mmap
+from collections import Counter
 
 from textnode import *
 from htmlnode import *
+from template import load_template
+from profiler import NULL_PROFILER
+from log import log
+from blockcache import get_block_cache
+from output import ReplacementFile
+from terms import count_terms
+
+INLINE_DELIMITER_RE = re.compile(r"\*\*|[*_`]")
+INLINE_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^\)]*)\)")
+INLINE_LINK_RE = re.compile(r"(?<!!)\[([^\]]*)\]\(([^\)]*)\)")
+HEADING_RE = re.compile(r"#{1,6} .*$")
+# Searching for this pattern with re is about twice as fast as bytes.find(b"\n\n") over a large buffer
+BLANK_LINE_RE = re.compile(rb"\n\n")
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -25,11 +40,11 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\]]*)\]\(([^\)]*)\)", text)
+    matches = INLINE_IMAGE_RE.findall(text)
     return matches
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\]]*)\]\(([^\)]*)\)", text)
+    matches = INLINE_LINK_RE.findall(text)
     return matches
 
 def format_markdown_url(format_string):
@@ -63,7 +78,7 @@ def split_nodes_images(old_nodes):
 def split_nodes_links(old_nodes):
     return split_nodes_with_url(old_nodes, extract_markdown_links, format_markdown_url("[{}]({})"), TextType.LINK)
 
-def text_to_textnodes(text):
+def text_to_textnodes_multipass(text):
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
@@ -73,67 +88,440 @@ def text_to_textnodes(text):
     nodes = split_nodes_links(nodes)
     return nodes
 
+
+# Rank follows the order text_to_textnodes_multipass applies its passes in; a lower rank splits first
+INLINE_DELIMITERS = {
+    "**": (0, TextType.BOLD),
+    "*": (1, TextType.ITALIC),
+    "_": (2, TextType.ITALIC),
+    "`": (3, TextType.CODE),
+}
+
+def append_link_nodes(text, start, end, nodes):
+    pos = start
+    for match in INLINE_LINK_RE.finditer(text, start, end):
+        if match.start() > pos:
+            nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+        nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        pos = match.end()
+    if pos < end:
+        nodes.append(TextNode(text[pos:end], TextType.TEXT))
+
+def append_url_nodes(text, nodes):
+    # Images first, then links in the gaps between them, the same as split_nodes_images followed by split_nodes_links
+    pos = 0
+    for match in INLINE_IMAGE_RE.finditer(text):
+        append_link_nodes(text, pos, match.start(), nodes)
+        nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        pos = match.end()
+    append_link_nodes(text, pos, len(text), nodes)
+
+def tokenize_inline(text):
+    nodes = []
+    open_delimiter = None
+    start = 0
+    for match in INLINE_DELIMITER_RE.finditer(text):
+        delimiter = match.group()
+        if open_delimiter is None:
+            if match.start() > start:
+                append_url_nodes(text[start:match.start()], nodes)
+            open_delimiter = delimiter
+            start = match.end()
+        elif delimiter == open_delimiter:
+            if match.start() > start:
+                nodes.append(TextNode(text[start:match.start()], INLINE_DELIMITERS[delimiter][1]))
+            open_delimiter = None
+            start = match.end()
+        elif INLINE_DELIMITERS[delimiter][0] < INLINE_DELIMITERS[open_delimiter][0]:
+            # An earlier pass would have split the open span here, leaving it unclosed.
+            # Let the multi-pass path raise so the error message stays the same.
+            return text_to_textnodes_multipass(text)
+        # Anything else is literal text inside the open span
+    if open_delimiter is not None:
+        return text_to_textnodes_multipass(text)
+    if start < len(text):
+        append_url_nodes(text[start:], nodes)
+    return nodes
+
+def text_to_textnodes(text):
+    return tokenize_inline(text)
+
+# Tags for delimited spans, as text_node_to_html_node would produce them
+INLINE_TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i", TextType.CODE: "code"}
+
+def leaf_value(value):
+    # LeafNode.to_html refuses empty values, so the direct renderer has to fail the same way
+    if not value:
+        raise ValueError("LeafNode must have a value")
+    return value
+
+def append_link_html(text, start, end, parts, refs, basepath):
+    pos = start
+    for match in INLINE_LINK_RE.finditer(text, start, end):
+        if match.start() > pos:
+            parts.append(escape_text(text[pos:match.start()]))
+        parts.append(f'<a href="{escape_attribute(rewrite_url(match.group(2), basepath))}">{escape_text(leaf_value(match.group(1)))}</a>')
+        refs.append((TextType.LINK.value, match.group(2)))
+        pos = match.end()
+    if pos < end:
+        parts.append(escape_text(text[pos:end]))
+
+def append_url_html(text, parts, refs, basepath):
+    pos = 0
+    for match in INLINE_IMAGE_RE.finditer(text):
+        append_link_html(text, pos, match.start(), parts, refs, basepath)
+        parts.append(f'<img src="{escape_attribute(rewrite_url(leaf_value(match.group(2)), basepath))}" alt="{escape_attribute(match.group(1))}">')
+        refs.append((TextType.IMAGE.value, match.group(2)))
+        pos = match.end()
+    append_link_html(text, pos, len(text), parts, refs, basepath)
+
+def nodes_to_html(nodes, basepath=None, refs=None):
+    if refs is not None:
+        refs.extend((node.text_type.value, node.url) for node in nodes if node.text_type in (TextType.LINK, TextType.IMAGE))
+    return [text_node_to_html_node(node).to_html(basepath) for node in nodes]
+
+def inline_html(text, basepath=None, refs=None):
+    # One HTML string per node text_to_textnodes(text) would return, without building the nodes.
+    # This is tokenize_inline emitting strings; the differential tests keep the two in step.
+    parts = []
+    found = []
+    open_delimiter = None
+    start = 0
+    for match in INLINE_DELIMITER_RE.finditer(text):
+        delimiter = match.group()
+        if open_delimiter is None:
+            if match.start() > start:
+                append_url_html(text[start:match.start()], parts, found, basepath)
+            open_delimiter = delimiter
+            start = match.end()
+        elif delimiter == open_delimiter:
+            if match.start() > start:
+                tag = INLINE_TAGS[INLINE_DELIMITERS[delimiter][1]]
+                parts.append(f"<{tag}>{escape_text(text[start:match.start()])}</{tag}>")
+            open_delimiter = None
+            start = match.end()
+        elif INLINE_DELIMITERS[delimiter][0] < INLINE_DELIMITERS[open_delimiter][0]:
+            return nodes_to_html(text_to_textnodes_multipass(text), basepath, refs)
+    if open_delimiter is not None:
+        return nodes_to_html(text_to_textnodes_multipass(text), basepath, refs)
+    if start < len(text):
+        append_url_html(text[start:], parts, found, basepath)
+    if refs is not None:
+        refs.extend(found)
+    return parts
+
+def iter_block_texts(lines):
+    # A blank line ends a block unless it is inside a ``` fence, so code samples may contain blank lines.
+    # Lines may come straight from a file; only the current block is ever held in memory.
+    # Yields (line number of the block's first line, block).
+    block_lines = []
+    start_line = None
+    in_fence = False
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if line == "" and not in_fence:
+            block = "\n".join(block_lines).strip()
+            if block != "":
+                yield start_line, block
+            block_lines = []
+            start_line = None
+            continue
+
+        if start_line is None and line.strip():
+            start_line = line_number
+        stripped = line.strip()
+        if in_fence:
+            in_fence = not stripped.endswith("```")
+        elif stripped.startswith("```") and not any(previous.strip() for previous in block_lines):
+            # Only a bare fence or one followed by an info string opens a code block; ```code``` is complete
+            in_fence = "`" not in stripped.lstrip("`")
+        block_lines.append(line)
+
+    block = "\n".join(block_lines).strip()
+    if block != "":
+        yield start_line, block
+
+def buffer_line_end(buffer, pos):
+    end = buffer.find(b"\n", pos)
+    return len(buffer) if end == -1 else end
+
+def fence_end(buffer, view, pos):
+    # Given the end of a line that opens a fence, returns the end of the line that closes it, or of the
+    # buffer. Only lines containing ``` can close a fence, so only those are decoded.
+    while True:
+        tick = buffer.find(b"```", pos)
+        if tick == -1:
+            return len(buffer)
+        line_start = buffer.rfind(b"\n", 0, tick) + 1
+        line_end = buffer_line_end(buffer, tick)
+        if line_start > pos and str(view[line_start:line_end], "utf-8").strip().endswith("```"):
+            return line_end
+        pos = line_end
+
+def iter_buffer_block_texts(buffer):
+    # iter_block_texts over the bytes of a file with \n line endings, e.g. an mmap. Boundaries are found
+    # in the bytes and each block is decoded straight from a memoryview slice, so no line is ever
+    # copied on its own and nothing outside the blocks is decoded.
+    size = len(buffer)
+    with memoryview(buffer) as view:
+        pos = 0
+        line_number = 1
+        while pos < size:
+            if buffer[pos] == 10:
+                # An empty line, which ends a block outside a fence
+                pos += 1
+                line_number += 1
+                continue
+
+            # A fence can only open on the block's first line with content. Most blocks start with a
+            # printable ASCII character other than a backtick, which settles that without decoding.
+            start = pos
+            skipped = 0
+            while not 32 < buffer[start] < 127 or buffer[start] == 96:
+                line_end = buffer_line_end(buffer, start)
+                first = str(view[start:line_end], "utf-8").strip()
+                if first:
+                    if first.startswith("```") and "`" not in first.lstrip("`"):
+                        start = fence_end(buffer, view, line_end)
+                    break
+                if line_end + 1 >= size or buffer[line_end + 1] == 10:
+                    # Nothing but whitespace up to the next empty line or the end of the file
+                    start = line_end
+                    break
+                start = line_end + 1
+                skipped += 1
+
+            blank = BLANK_LINE_RE.search(buffer, start)
+            end = blank.start() if blank else size
+            text = str(view[pos:end], "utf-8")
+            block = text.strip()
+            if block:
+                yield line_number + skipped, block
+            # Step over the empty line that ended the block as well
+            line_number += text.count("\n") + 2
+            pos = end + 2
+
+class MarkdownSource:
+    # Opens a markdown file for block-at-a-time reading. The file is memory-mapped, so the OS pages in
+    # only what is scanned and only blocks are decoded. Files with \r line endings, which text mode
+    # would translate, go through the line reader instead.
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.buffer = None
+        self.blocks = None
+
+    def __enter__(self):
+        self.file = open(self.path, "rb")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            # An empty file can't be mapped
+            self.buffer = b""
+        else:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer.find(b"\r") != -1:
+            self.close_buffer()
+            self.file.close()
+            self.file = open(self.path, "r")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.blocks is not None:
+            # Releases the generator's view of the mmap, which can't be closed while it is held
+            self.blocks.close()
+        self.close_buffer()
+        self.file.close()
+        return False
+
+    def close_buffer(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.buffer = None
+
+    def first_line(self):
+        if self.buffer is None:
+            line = self.file.readline()
+            self.file.seek(0)
+            return line
+        return self.buffer[:buffer_line_end(self.buffer, 0) + 1].decode("utf-8")
+
+    def iter_blocks(self):
+        self.blocks = iter_buffer_block_texts(self.buffer) if self.buffer is not None else iter_block_texts(self.file)
+        for line_number, block in self.blocks:
+            yield block_to_block_type(block), block, line_number
+
+def iter_blocks(lines):
+    for line_number, block in iter_block_texts(lines):
+        yield block_to_block_type(block), block, line_number
+
 def markdown_to_blocks(markdown):
-    blocks = []
-    for part in markdown.split("\n\n"):
-        block = part.strip().strip("\n")
-        if block != "":
-            blocks.append(block)
-    return blocks
+    return [block for _, block in iter_block_texts(markdown.split("\n"))]
 
 def block_to_block_type(block):
-    if re.match(r"^#{1,6} .*$", block):
-        return "heading"
-    if block.startswith("```") and block.endswith("```"):
-        return "code"
-    line_starts = [line.split(" ", 1)[0] for line in block.split("\n")]
-    if all([prefix == ">" for prefix in line_starts]):
-        return "quote"
-    if all([prefix == "*" or prefix == "-" for prefix in line_starts]):
-        return "unordered_list"
-    if all([prefix == f"{i+1}." for i, prefix in enumerate(line_starts)]):
-        return "ordered_list"
+    # Only the first character can make a block anything but a paragraph, so dispatch on it
+    # and stop checking list and quote markers at the first line that doesn't have one
+    first = block[:1]
+    if first == "#":
+        return "heading" if HEADING_RE.match(block) else "paragraph"
+    if first == "`":
+        return "code" if block.startswith("```") and block.endswith("```") else "paragraph"
+    if first == ">":
+        if all(line == ">" or line.startswith("> ") for line in block.split("\n")):
+            return "quote"
+    elif first == "*" or first == "-":
+        if all(line in ("*", "-") or line.startswith(("* ", "- ")) for line in block.split("\n")):
+            return "unordered_list"
+    elif first == "1":
+        if all(line.split(" ", 1)[0] == f"{i + 1}." for i, line in enumerate(block.split("\n"))):
+            return "ordered_list"
     return "paragraph"
 
-def text_to_children(text):
+def text_to_children(text, refs=None):
     nodes = text_to_textnodes(text)
+    if refs is not None:
+        # Record every link and image target as (text type, url) for the dependency graph
+        refs.extend((node.text_type.value, node.url) for node in nodes if node.text_type in (TextType.LINK, TextType.IMAGE))
     return [text_node_to_html_node(node) for node in nodes]
 
-def markdown_to_htmlnode(markdown):
-    blocks = [(block_to_block_type(block), block) for block in markdown_to_blocks(markdown)]
+def block_to_htmlnode(block_type, block, refs=None):
+    if block_type == "heading":
+        parts = block.split(" ", 1)
+        tag = f"h{len(parts[0])}"
+        children = text_to_children(parts[1], refs)
+    elif block_type == "code":
+        tag = "pre"
+        children = [text_node_to_html_node(TextNode(block[3:-3], TextType.CODE))]
+    elif block_type == "quote":
+        tag = "blockquote"
+        children = text_to_children("\n".join([line[2:] for line in block.split("\n")]), refs)
+    elif block_type == "unordered_list":
+        tag = "ul"
+        children = [ParentNode("li", text_to_children(item[2:], refs)) for item in block.split("\n")]
+    elif block_type == "ordered_list":
+        tag = "ol"
+        children = [ParentNode("li", text_to_children(item.split(" ", 1)[1], refs)) for item in block.split("\n")]
+    else:
+        tag = "p"
+        children = text_to_children(block, refs)
+    if not children:
+        return None
+    return ParentNode(tag, children)
+
+def wrap_html(tag, parts):
+    # An element with no children is dropped, as block_to_htmlnode returns None for it
+    if not parts:
+        return ""
+    return f"<{tag}>{''.join(parts)}</{tag}>"
+
+def block_to_html(block_type, block, basepath=None, refs=None):
+    # Same string as block_to_htmlnode(block_type, block, refs).to_html(basepath), or "" where that
+    # returns None, written straight from the inline tokens with no TextNode, LeafNode or ParentNode
+    found = []
+    try:
+        html = direct_block_html(block_type, block, basepath, found)
+    except Exception:
+        # The tree parses the whole block before serializing any of it, so for a block with several
+        # problems it can raise a different one first; let it raise its own error
+        return block_to_html_tree(block_type, block, basepath, refs)
+    if refs is not None:
+        refs.extend(found)
+    return html
+
+def direct_block_html(block_type, block, basepath, refs):
+    if block_type == "heading":
+        level, text = block.split(" ", 1)
+        return wrap_html(f"h{len(level)}", inline_html(text, basepath, refs))
+    if block_type == "code":
+        return f"<pre><code>{escape_text(leaf_value(block[3:-3]))}</code></pre>"
+    if block_type == "quote":
+        return wrap_html("blockquote", inline_html("\n".join([line[2:] for line in block.split("\n")]), basepath, refs))
+    if block_type == "unordered_list" or block_type == "ordered_list":
+        items = []
+        for item in block.split("\n"):
+            item_parts = inline_html(item[2:] if block_type == "unordered_list" else item.split(" ", 1)[1], basepath, refs)
+            if not item_parts:
+                raise ValueError("ParentNode must have children")
+            items.append(f"<li>{''.join(item_parts)}</li>")
+        return wrap_html("ul" if block_type == "unordered_list" else "ol", items)
+    return wrap_html("p", inline_html(block, basepath, refs))
+
+def block_to_html_tree(block_type, block, basepath=None, refs=None):
+    node = block_to_htmlnode(block_type, block, refs)
+    return node.to_html(basepath) if node else ""
+
+# How render_block turns a block into HTML; "tree" goes through block_to_htmlnode
+RENDERERS = {"direct": block_to_html, "tree": block_to_html_tree}
+RENDERER = "direct"
+
+def set_renderer(name):
+    global RENDERER
+    RENDERER = name
+
+def markdown_to_htmlnode(markdown, profiler=NULL_PROFILER, refs=None):
     nodes = []
-    for block_type, block in blocks:
-        # print(f"block_type: {block_type}; block: {block}")
-        tag = None
-        text = None
-        children = None
-
-        if block_type == "heading":
-            parts = block.split(" ", 1)
-            tag = f"h{len(parts[0])}"
-            text = parts[1]
-            children = text_to_children(text)
-        elif block_type == "code":
-            tag = "pre"
-            text = block[3:-3]
-            children = [text_node_to_html_node(TextNode(text, TextType.CODE))]
-        elif block_type == "quote":
-            tag = "blockquote"
-            text = "\n".join([line[2:] for line in block.split("\n")])
-            children = text_to_children(text)
-        elif block_type == "unordered_list":
-            tag = "ul"
-            children = [ParentNode("li", text_to_children(item[2:])) for item in block.split("\n")]
-        elif block_type == "ordered_list":
-            tag = "ol"
-            children = [ParentNode("li", text_to_children(item.split(" ", 1)[1])) for item in block.split("\n")]
-        else:
-            tag = "p"
-            children = text_to_children(block)
-        if children:
-            nodes.append(ParentNode(tag, children))
-        parent = ParentNode("div", nodes)
-    return parent
+    for block in profiler.measure("markdown_to_blocks", markdown_to_blocks, markdown):
+        block_type = profiler.measure("block_to_block_type", block_to_block_type, block)
+        node = profiler.measure("inline", block_to_htmlnode, block_type, block, refs)
+        if node:
+            nodes.append(node)
+    return ParentNode("div", nodes)
+
+def markdown_to_html_profiled(markdown, basepath, profiler, refs):
+    # The current renderer's block_to_html timed per block, as render_block runs it minus the block cache
+    render = RENDERERS[RENDERER]
+    parts = ["<div>"]
+    for block in profiler.measure("markdown_to_blocks", markdown_to_blocks, markdown):
+        block_type = profiler.measure("block_to_block_type", block_to_block_type, block)
+        parts.append(profiler.measure("block_to_html", render, block_type, block, basepath, refs))
+    parts.append("</div>")
+    return "".join(parts)
+
+def locate_refs(block, refs):
+    # Adds the line within the block to each (text type, url) reference, scanning forward
+    # from the previous match because refs come out of the tokenizer in source order
+    located = []
+    pos = 0
+    line = 0
+    for text_type, url in refs:
+        index = block.find(f"]({url})", pos)
+        if index != -1:
+            line += block.count("\n", pos, index)
+            pos = index
+        located.append((text_type, url, line))
+    return located
+
+def render_block(block_type, block, basepath, cache=None):
+    # Returns the block's HTML and the (text type, url, line offset) references found while parsing it
+    render = RENDERERS[RENDERER]
+    if cache is None:
+        refs = []
+        html = render(block_type, block, basepath, refs)
+        return html, locate_refs(block, refs)
+
+    key = cache.key(block_type, block, basepath)
+    cached = cache.get(key)
+    if cached is None:
+        refs = []
+        html = render(block_type, block, basepath, refs)
+        cached = (html, locate_refs(block, refs))
+        cache.put(key, cached)
+    return cached
+
+def blocks_to_html_chunks(blocks, basepath=None, cache=None, refs=None, terms=None):
+    # blocks are (block type, block, line number) as produced by iter_blocks.
+    # terms, if given, is a Counter that collects the words of each block for the search index.
+    yield "<div>"
+    for block_type, block, line_number in blocks:
+        html, block_refs = render_block(block_type, block, basepath, cache)
+        if refs is not None:
+            refs.extend((text_type, url, line_number + offset) for text_type, url, offset in block_refs)
+        if terms is not None:
+            count_terms(html, terms)
+        yield html
+    yield "</div>"
+
+def markdown_to_html_chunks(markdown, basepath=None, cache=None):
+    # Same output as markdown_to_htmlnode(markdown).iter_html(basepath), rendered one block at a time
+    return blocks_to_html_chunks(iter_blocks(markdown.split("\n")), basepath, cache)
 
 def extract_title(markdown):
     lines = markdown.split("\n")
@@ -141,25 +529,67 @@ def extract_title(markdown):
         return lines[0][2:].strip()
     raise Exception("No title found")
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} usning {template_path}")
+def read_file(path):
+    with open(path, "r") as f:
+        return f.read()
+
+def generate_page(from_path, template_path, dest_path, basepath, profiler=NULL_PROFILER, writer=None, index=None):
+    # Returns the page's link and image references as (text type, url, line number).
+    # index, if given, is a dict that receives the page's "title" and a Counter of its "terms" for the search index.
+    log(f"Generating page from {from_path} to {dest_path} usning {template_path}")
+
+    template = load_template(template_path, basepath)
+    if profiler:
+        return generate_page_profiled(from_path, template, dest_path, basepath, profiler, writer, index)
+
+    with MarkdownSource(from_path) as src:
+        page_title = extract_title(src.first_line())
+        refs = []
+        terms = None
+        if index is not None:
+            terms = index["terms"] = Counter()
+            index["title"] = page_title
+        # Read, render and write one block at a time so memory scales with the largest block, not the page
+        content = blocks_to_html_chunks(src.iter_blocks(), basepath, get_block_cache(), refs, terms)
+        chunks = template.iter_render({"Title": escape_text(page_title), "Content": content})
+
+        if writer:
+            # The writer creates the directory and decides when and whether the page hits the disk
+            writer.write(dest_path, chunks)
+            return refs
 
-    with open(from_path, "r") as f:
-        markdown = f.read()
-    with open(template_path, "r") as f:
-        template = f.read()
+        dest_dir = os.path.dirname(dest_path)
+        if not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        with ReplacementFile(dest_path) as f:
+            f.writelines(chunks)
+    return refs
 
+def generate_page_profiled(from_path, template, dest_path, basepath, profiler, writer=None, index=None):
+    # Materialize each step so every phase is timed separately.
+    # This bypasses the block cache and streaming so every phase is actually measured.
+    markdown = profiler.measure("read", read_file, from_path)
     page_title = extract_title(markdown)
-    html_content = markdown_to_htmlnode(markdown).to_html()
+    refs = []
+    if RENDERER == "tree":
+        html_node = markdown_to_htmlnode(markdown, profiler, refs)
+        html = profiler.measure("to_html", html_node.to_html, basepath)
+    else:
+        html = markdown_to_html_profiled(markdown, basepath, profiler, refs)
+    refs = [(text_type, url, line + 1) for text_type, url, line in locate_refs(markdown, refs)]
+    if index is not None:
+        index["title"] = page_title
+        index["terms"] = Counter()
+        count_terms(html, index["terms"])
 
-    page_content = template.replace("{{ Title }}", page_title)
-    page_content = page_content.replace("{{ Content }}", html_content)
-    page_content = page_content.replace('href="/', f'href="{basepath}')
-    page_content = page_content.replace('src="/', f'src="{basepath}')
+    page = profiler.measure("template", template.render, {"Title": escape_text(page_title), "Content": html})
+    if writer:
+        profiler.measure("write", writer.write, dest_path, [page])
+        return refs
 
     dest_dir = os.path.dirname(dest_path)
     if not os.path.exists(dest_dir):
         os.makedirs(dest_dir)
-    
-    with open(dest_path, "w") as f:
-        f.write(page_content)
\ No newline at end of file
+    with ReplacementFile(dest_path) as f:
+        profiler.measure("write", f.write, page)
+    return refs
@@ -0,0 +1,50 @@
+import os
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+def snapshot(paths):
+    # {file path: (mtime, size)} for every file under the given files and directories
+    files = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in os.scandir(path):
+                if entry.is_dir():
+                    files.update(snapshot([entry.path]))
+                else:
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        elif os.path.exists(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def diff_snapshots(old, new):
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    # Serves the site under basepath, where the built pages link to it; anything outside it is a 404
+    def __init__(self, *args, basepath="/", **kwargs):
+        self.basepath = basepath or "/"
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        if not self.path.startswith(self.basepath):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        return super().send_head()
+
+    def translate_path(self, path):
+        return super().translate_path("/" + path[len(self.basepath):])
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(directory, port, basepath="/"):
+    server = ThreadingHTTPServer(("", port), partial(QuietHandler, directory=directory, basepath=basepath))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server